@@ -0,0 +1,75 @@
+import numpy as np
+
+# Exécution groupée des opérations matricielles : les éléments de même opération
+# et de même forme sont empilés en (k, n, n) et traités en un seul appel NumPy.
+
+NORM_ORDS = {"1": 1, "2": 2, "inf": np.inf, "fro": "fro"}
+
+
+def stacked_op(op, mats, vecs=None, norm_type="fro"):
+    """Apply `op` to a (k, n, m) stack; returns one JSON-ready value per matrix."""
+    if op == "determinant":
+        return [float(d) for d in np.linalg.det(mats)]
+    if op == "inverse":
+        return np.linalg.inv(mats).tolist()
+    if op == "transpose":
+        return np.swapaxes(mats, 1, 2).tolist()
+    if op == "norm":
+        ord = NORM_ORDS.get(norm_type, "fro")
+        return [float(v) for v in np.linalg.norm(mats, ord, axis=(1, 2))]
+    if op == "product":
+        return (mats @ vecs[..., None])[..., 0].tolist()
+    if op == "solve":
+        return np.linalg.solve(mats, vecs[..., None])[..., 0].tolist()
+    raise ValueError(f"Opération non supportée: {op}")
+
+
+def prepare_item(item):
+    mat = np.array(item.matrix, dtype=float)
+    if mat.ndim != 2:
+        raise ValueError("La matrice doit être un tableau 2D.")
+    if item.op in ("determinant", "inverse", "solve") and mat.shape[0] != mat.shape[1]:
+        raise ValueError("La matrice doit être carrée.")
+    vec = None
+    if item.op in ("product", "solve"):
+        if item.vector is None:
+            raise ValueError("Le vecteur n'est pas fourni.")
+        vec = np.array(item.vector, dtype=float)
+        expected = mat.shape[1] if item.op == "product" else mat.shape[0]
+        if vec.shape != (expected,):
+            raise ValueError(f"Le vecteur doit avoir {expected} composantes.")
+    return mat, vec
+
+
+def run_batch(items):
+    """
+    Return one {"result": ...} or {"error": ...} per item, in request order.
+    A failing group (e.g. one singular matrix in an inverse stack) is retried
+    item by item so the error stays local to the offending entry.
+    """
+    results = [None] * len(items)
+    groups = {}
+    for idx, item in enumerate(items):
+        try:
+            mat, vec = prepare_item(item)
+        except Exception as e:
+            results[idx] = {"error": str(e)}
+            continue
+        norm_type = item.norm_type if item.op == "norm" else None
+        groups.setdefault((item.op, mat.shape, norm_type), []).append((idx, mat, vec))
+
+    for (op, _, norm_type), members in groups.items():
+        mats = np.stack([mat for _, mat, _ in members])
+        vecs = np.stack([vec for _, _, vec in members]) if members[0][2] is not None else None
+        try:
+            values = stacked_op(op, mats, vecs, norm_type)
+            for (idx, _, _), value in zip(members, values):
+                results[idx] = {"result": value}
+        except Exception:
+            for idx, mat, vec in members:
+                try:
+                    value = stacked_op(op, mat[None], None if vec is None else vec[None], norm_type)[0]
+                    results[idx] = {"result": value}
+                except Exception as e:
+                    results[idx] = {"error": str(e)}
+    return results
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test de charge: N clients concurrents sur GET /modules et POST /progress/video, handlers
+synchrones (ancienne version, threadpool de Starlette) vs handlers async + AsyncDatabaseManager,
+la progression vidéo écrite à chaque requête (PROGRESS_FLUSH_MS=0) ou tamponnée (500 ms, tampon
+vidé avant la fin de la mesure).
+
+Les requêtes passent par la pile ASGI complète (httpx + ASGITransport, dans le processus).
+
+Usage:
+    python benchmarks/bench_async_db.py [--clients 500] [--requests-per-client 10] [--write-ratio 0.1]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+from fastapi import FastAPI, HTTPException
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+_tmpdir = tempfile.mkdtemp(prefix="bench_async_db_")
+os.environ["SQLITE_DB_PATH"] = os.path.join(_tmpdir, "import.db")
+os.environ.setdefault("PLOT_CACHE_DIR", "")
+import database  # noqa: E402
+import main as api  # noqa: E402
+from bench_db_pool import seed  # noqa: E402
+from progress_buffer import VideoProgressBuffer  # noqa: E402
+
+
+def legacy_app(manager):
+    """GET /modules and POST /progress/video as sync handlers, as before the async layer."""
+    app = FastAPI()
+
+    @app.get("/modules")
+    def get_modules():
+        query = """
+        SELECT m.*, u.nom as enseignant_nom
+        FROM module m
+        LEFT JOIN utilisateur u ON m.id_enseignant = u.id_utilisateur
+        WHERE m.actif = 1
+        """
+        modules = []
+        for row in manager.execute_query(query):
+            module_dict = api.parse_module_row(row).dict()
+            module_dict['enseignant_nom'] = row.get('enseignant_nom')
+            modules.append(module_dict)
+        return modules
+
+    @app.post("/progress/video")
+    def track_video_progress(progress_data: dict):
+        user_id = progress_data.get('user_id')
+        lesson_id = progress_data.get('lesson_id')
+        progress_percentage = progress_data.get('progress_percentage')
+        if not all([user_id, lesson_id, progress_percentage is not None]):
+            raise HTTPException(status_code=400, detail="Missing required fields")
+        existing = manager.execute_query(
+            "SELECT * FROM progression_etudiant WHERE id_etudiant = ? AND id_lecon = ?", (user_id, lesson_id)
+        )
+        if existing:
+            manager.execute_query(
+                "UPDATE progression_etudiant SET score = ?, temps_passe = ? WHERE id_etudiant = ? AND id_lecon = ?",
+                (progress_percentage, 0, user_id, lesson_id),
+            )
+        else:
+            manager.execute_query(
+                "INSERT INTO progression_etudiant (id_etudiant, id_lecon, statut, score, temps_passe)"
+                " VALUES (?, ?, 'en_cours', ?, 0)",
+                (user_id, lesson_id, progress_percentage),
+            )
+        return {"message": "Video progress tracked successfully"}
+
+    return app
+
+
+async def load(app, clients, per_client, write_ratio, users, buffer=None):
+    rng = random.Random(0)
+    latencies = []
+    errors = 0
+
+    async def client(http):
+        nonlocal errors
+        for _ in range(per_client):
+            start = time.perf_counter()
+            if rng.random() < write_ratio:
+                r = await http.post("/progress/video", json={
+                    "user_id": rng.randint(2, users),
+                    "lesson_id": rng.randint(1, 50),
+                    "progress_percentage": rng.randint(0, 100),
+                })
+            else:
+                r = await http.get("/modules")
+            latencies.append(time.perf_counter() - start)
+            errors += r.status_code != 200
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        start = time.perf_counter()
+        if buffer is not None:
+            buffer.start()
+        await asyncio.gather(*(client(http) for _ in range(clients)))
+        if buffer is not None:
+            # Écritures en attente comptées dans la mesure
+            await buffer.close()
+        elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, np.percentile(latencies, [50, 99]) * 1000, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests-per-client", type=int, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--modules", type=int, default=50)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'variant':>14} {'req/s':>9} {'p50 (ms)':>10} {'p99 (ms)':>10} {'errors':>7}")
+    # variante -> intervalle du tampon de progression (None : handlers synchrones)
+    variants = {"sync handlers": None, "async handlers": 0, "async buffered": 0.5}
+    for name, flush_interval in variants.items():
+        os.environ["SQLITE_DB_PATH"] = os.path.join(_tmpdir, f"{name.replace(' ', '_')}.db")
+        manager = database.DatabaseManager()
+        seed(manager, args.modules, args.users)
+        buffer = None
+        if flush_interval is None:
+            app = legacy_app(manager)
+        else:
+            app = api.app
+            api.async_db_manager = database.AsyncDatabaseManager(manager)
+            # Tampon lié au gestionnaire du benchmark (l'instance globale écrit dans la base d'import)
+            buffer = VideoProgressBuffer(api.async_db_manager, flush_interval=flush_interval)
+            api.progress_buffer = buffer
+        throughput, (p50, p99), errors = asyncio.run(
+            load(app, args.clients, args.requests_per_client, args.write_ratio, args.users,
+                 buffer if flush_interval else None)
+        )
+        if buffer is not None:
+            written = manager.execute_query("SELECT COUNT(*) AS n FROM progression_etudiant")[0]["n"]
+            assert buffer.stats()["pending"] == 0 and written, "progress writes did not reach the database"
+            api.async_db_manager.close()
+        manager.close()
+        print(f"{name:>14} {throughput:>9.0f} {p50:>10.1f} {p99:>10.1f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
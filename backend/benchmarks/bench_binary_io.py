@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: corps JSON vs .npy pour /matrix/transpose (coût dominé par l'encodage).
+
+Usage:
+    python benchmarks/bench_binary_io.py [--sizes 100 500 1000 2000]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from matrix_router import router  # noqa: E402
+from binary_io import NPY_MEDIA_TYPE  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000, 2000])
+    args = parser.parse_args()
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    rng = np.random.default_rng(0)
+
+    print(f"{'n':>6} {'json (s)':>10} {'json (MB)':>10} {'npy (s)':>10} {'npy (MB)':>10} {'speedup':>9}")
+    for n in args.sizes:
+        A = rng.standard_normal((n, n))
+
+        def json_call():
+            body = json.dumps({"matrix": A.tolist()})
+            r = client.post("/matrix/transpose", content=body, headers={"content-type": "application/json"})
+            np.array(r.json()["result"])
+            return len(body) + len(r.content)
+
+        def npy_call():
+            buf = io.BytesIO()
+            np.save(buf, A)
+            body = buf.getvalue()
+            r = client.post(
+                "/matrix/transpose",
+                content=body,
+                headers={"content-type": NPY_MEDIA_TYPE, "accept": NPY_MEDIA_TYPE},
+            )
+            np.load(io.BytesIO(r.content))
+            return len(body) + len(r.content)
+
+        t_json, size_json = timed(json_call)
+        t_npy, size_npy = timed(npy_call)
+        print(f"{n:>6} {t_json:>10.3f} {size_json / 1e6:>10.1f} {t_npy:>10.3f} {size_npy / 1e6:>10.1f} {t_json / t_npy:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
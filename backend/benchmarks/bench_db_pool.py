@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark: lectures GET /modules et écritures de progression vidéo concurrentes, connexion
+SQLite unique verrouillée (ancienne version) vs pool de lecteurs en mode WAL.
+
+Le handler GET /modules de main.py est exécuté directement dans un pool de threads, ses
+requêtes SQL étant faites dans le thread appelant ; une écriture est l'upsert de
+progress_buffer.write_progress_batch pour une entrée, dans sa propre transaction (comme
+POST /progress/video avec PROGRESS_FLUSH_MS=0). Seul l'accès à la base est comparé (la charge
+HTTP de bout en bout est mesurée par bench_async_db.py).
+
+Usage:
+    python benchmarks/bench_db_pool.py [--threads 16] [--requests 4000] [--write-ratio 0.1]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+_tmpdir = tempfile.mkdtemp(prefix="bench_db_")
+os.environ["SQLITE_DB_PATH"] = os.path.join(_tmpdir, "import.db")
+os.environ.setdefault("PLOT_CACHE_DIR", "")
+import database  # noqa: E402
+import main as api  # noqa: E402
+from progress_buffer import write_progress_batch  # noqa: E402
+
+
+class LegacyDatabaseManager(database.DatabaseManager):
+    """Single connection, default journal, every query under one lock."""
+
+    def __init__(self):
+        self.db_path = os.environ["SQLITE_DB_PATH"]
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        self.read_connections = 0
+        self.create_tables()
+        # Index unique requis par l'upsert de write_progress_batch
+        self.migrate()
+
+    def execute_query(self, query, params=None):
+        with self.lock:
+            cursor = self.connection.cursor()
+            cursor.execute(query, params or ())
+            if query.strip().upper().startswith("SELECT"):
+                return [dict(row) for row in cursor.fetchall()]
+            self.connection.commit()
+            if query.strip().upper().startswith("INSERT"):
+                return [dict(cursor.execute("SELECT last_insert_rowid() as id").fetchone())]
+            return []
+
+    def close(self):
+        self.connection.close()
+
+
+class InlineDatabase:
+    """Async interface of the handlers, queries run synchronously in the calling thread."""
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    async def execute_query(self, query, params=None):
+        return self.manager.execute_query(query, params)
+
+
+def run_inline(coro):
+    # InlineDatabase ne suspend jamais : la coroutine se termine au premier send()
+    try:
+        coro.send(None)
+    except StopIteration as e:
+        return e.value
+    raise RuntimeError("handler suspended")
+
+
+def seed(manager, modules, users):
+    for i in range(users):
+        manager.execute_query(
+            "INSERT INTO utilisateur (nom, email, mot_de_passe, role) VALUES (?, ?, ?, ?)",
+            (f"user{i}", f"user{i}@example.com", "x", "etudiant" if i else "enseignant"),
+        )
+    for i in range(modules):
+        manager.execute_query(
+            "INSERT INTO module (titre, type, description, contenu, id_enseignant, categorie, niveau, duree, objectifs)"
+            " VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?)",
+            (f"Module {i}", "cours", "description " * 20, "contenu " * 200, '["analyse"]', "L1", "2h", '["a", "b"]'),
+        )
+
+
+def run(manager, threads, requests, write_ratio, users):
+    api.async_db_manager = InlineDatabase(manager)
+    rng = random.Random(0)
+    ops = ["write" if rng.random() < write_ratio else "read" for _ in range(requests)]
+    latencies = {"read": [], "write": []}
+
+    def call(op):
+        start = time.perf_counter()
+        if op == "read":
+            run_inline(api.get_modules())
+        else:
+            progress = rng.randint(0, 100)
+            manager.run_in_transaction(
+                write_progress_batch, {(rng.randint(2, users), rng.randint(1, 50)): (progress, progress)}
+            )
+        return op, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        for op, latency in pool.map(call, ops):
+            latencies[op].append(latency)
+    elapsed = time.perf_counter() - start
+    return requests / elapsed, {op: np.percentile(v, [50, 99]) * 1000 for op, v in latencies.items() if v}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--modules", type=int, default=200)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+
+    variants = [
+        ("lock unique", LegacyDatabaseManager),
+        ("pool WAL", database.DatabaseManager),
+    ]
+    print(f"{'variant':>12} {'req/s':>9} {'read p50/p99 (ms)':>19} {'write p50/p99 (ms)':>20}")
+    for name, cls in variants:
+        os.environ["SQLITE_DB_PATH"] = os.path.join(_tmpdir, f"{cls.__name__}.db")
+        manager = cls()
+        seed(manager, args.modules, args.users)
+        throughput, pct = run(manager, args.threads, args.requests, args.write_ratio, args.users)
+        manager.close()
+        read, write = pct["read"], pct.get("write", (0, 0))
+        print(f"{name:>12} {throughput:>9.0f} {read[0]:>9.2f}/{read[1]:<9.2f} {write[0]:>9.2f}/{write[1]:<9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Jacobi / Gauss-Seidel, boucles Python (ancienne version) vs balayages vectorisés.
+
+Usage:
+    python benchmarks/bench_iterative.py [--iters 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from iterative_solvers import sweeps  # noqa: E402
+
+
+def legacy_jacobi(mat, b, x, iters):
+    n = len(mat)
+    for _ in range(iters):
+        x_new = np.zeros(n)
+        for i in range(n):
+            s = sum(mat[i][j] * x[j] for j in range(n) if j != i)
+            x_new[i] = (b[i] - s) / mat[i][i]
+        x = x_new
+    return x
+
+
+def legacy_gauss_seidel(mat, b, x, iters):
+    n = len(mat)
+    for _ in range(iters):
+        x_new = x.copy()
+        for i in range(n):
+            s1 = sum(mat[i][j] * x_new[j] for j in range(i))
+            s2 = sum(mat[i][j] * x[j] for j in range(i + 1, n))
+            x_new[i] = (b[i] - s1 - s2) / mat[i][i]
+        x = x_new
+    return x
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iters", type=int, default=10)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500, 1000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'n':>6} {'method':>14} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>9}")
+    for n in args.sizes:
+        A = rng.uniform(-1, 1, size=(n, n))
+        A += np.diag(np.abs(A).sum(axis=1) + 1)  # diagonale strictement dominante
+        b = rng.uniform(-1, 1, size=n)
+        x0 = np.zeros(n)
+        # tol=0 force exactement `iters` balayages des deux côtés
+        cases = [
+            ("jacobi", legacy_jacobi),
+            ("gauss-seidel", legacy_gauss_seidel),
+        ]
+        for name, legacy in cases:
+            t_old = timed(legacy, A, b, x0, args.iters)
+            t_new = timed(lambda: list(sweeps(name, A, b, x0, args.iters, 0.0)))
+            print(f"{n:>6} {name:>14} {t_old:>12.4f} {t_new:>15.5f} {t_old / t_new:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
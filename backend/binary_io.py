@@ -0,0 +1,76 @@
+import io
+import numpy as np
+
+# Corps binaires pour les endpoints matriciels : .npy (application/x-npy) ou
+# float64 brut little-endian (application/octet-stream + en-tête X-Matrix-Shape).
+
+NPY_MEDIA_TYPE = "application/x-npy"
+RAW_MEDIA_TYPE = "application/octet-stream"
+BINARY_MEDIA_TYPES = (NPY_MEDIA_TYPE, RAW_MEDIA_TYPE)
+SHAPE_HEADER = "x-matrix-shape"
+
+
+def media_type(content_type):
+    return (content_type or "application/json").split(";")[0].strip().lower()
+
+
+def parse_shape(value):
+    """Parse an 'n,m' (or 'n') shape header."""
+    if not value:
+        raise ValueError(f"L'en-tête {SHAPE_HEADER} est requis pour {RAW_MEDIA_TYPE}.")
+    try:
+        shape = tuple(int(part) for part in value.replace("x", ",").split(","))
+    except ValueError:
+        raise ValueError(f"En-tête {SHAPE_HEADER} invalide: {value}")
+    if not shape or any(dim <= 0 for dim in shape):
+        raise ValueError(f"En-tête {SHAPE_HEADER} invalide: {value}")
+    return shape
+
+
+def decode_npy(body):
+    """
+    Decode a .npy payload as a read-only view on the request body
+    (np.frombuffer after the header, no copy).
+    """
+    fp = io.BytesIO(body)
+    version = np.lib.format.read_magic(fp)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(fp)
+    elif version in ((2, 0), (3, 0)):
+        # La 3.0 ne diffère de la 2.0 que par l'encodage utf-8 des noms de champs
+        # (dtypes structurés, refusés plus bas) : même lecture d'en-tête
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(fp)
+    else:
+        raise ValueError(f"Version du format .npy non supportée : {version[0]}.{version[1]}.")
+    if dtype.hasobject:
+        raise ValueError("Les tableaux d'objets ne sont pas acceptés.")
+    # Complexes, dates, chaînes... : les endpoints travaillent sur des réels (float64)
+    if dtype.kind not in "biuf":
+        raise ValueError(f"Type de tableau non accepté : {dtype} (réels uniquement).")
+    count = int(np.prod(shape))
+    arr = np.frombuffer(body, dtype=dtype, count=count, offset=fp.tell())
+    return arr.reshape(shape, order="F" if fortran_order else "C")
+
+
+def decode_raw(body, shape_header):
+    shape = parse_shape(shape_header)
+    expected = int(np.prod(shape)) * 8
+    if len(body) != expected:
+        raise ValueError(f"Taille du corps ({len(body)} octets) incompatible avec la forme {shape} en float64.")
+    return np.frombuffer(body, dtype="<f8").reshape(shape)
+
+
+def decode_array(body, content_type, shape_header=None):
+    if media_type(content_type) == NPY_MEDIA_TYPE:
+        return decode_npy(body)
+    return decode_raw(body, shape_header)
+
+
+def wants_npy(accept):
+    return NPY_MEDIA_TYPE in (accept or "")
+
+
+def encode_npy(arr):
+    buf = io.BytesIO()
+    np.save(buf, np.asarray(arr), allow_pickle=False)
+    return buf.getvalue()
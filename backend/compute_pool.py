@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+# Exécuteur de calcul : les handlers numériques (CPU, GIL) tournent dans un pool de
+# processus borné au lieu du threadpool de Starlette partagé avec les endpoints CRUD.
+# Les fonctions soumises doivent être définies au niveau module (picklables).
+
+
+class CPUTimeExceeded(BaseException):
+    # BaseException : un `except Exception` dans le code exécuté ne l'intercepte pas
+    pass
+
+
+def _cpu_time_exceeded(signum, frame):
+    raise CPUTimeExceeded("Temps CPU maximal dépassé.")
+
+
+def warm_up_numeric():
+    # Imports coûteux faits une fois par worker, pas à la première requête
+    import numpy  # noqa: F401
+    import scipy.linalg  # noqa: F401
+    import scipy.sparse  # noqa: F401
+
+
+def _init_worker(warm_up, memory_limit):
+    if memory_limit:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    warm_up()
+
+
+def _run_job(fn, args, kwargs, cpu_limit):
+    """Worker side: run fn under a CPU-time limit (SIGPROF) and time it."""
+    started_at = time.time()
+    use_timer = cpu_limit and hasattr(signal, "setitimer")
+    if use_timer:
+        signal.signal(signal.SIGPROF, _cpu_time_exceeded)
+        # Réarmé chaque seconde CPU si le code intercepte la première exception
+        signal.setitimer(signal.ITIMER_PROF, cpu_limit, 1.0)
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        if use_timer:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+    return result, started_at, time.time()
+
+
+class ComputeExecutor:
+    def __init__(self, max_workers=2, max_queue=16, cpu_timeout=30.0, memory_limit=0, warm_up=warm_up_numeric):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.cpu_timeout = cpu_timeout
+        # Limite d'espace d'adressage (octets) de chaque worker, 0 = aucune
+        self.memory_limit = memory_limit
+        self.warm_up = warm_up
+        # Limite murale de secours (jobs bloqués hors bytecode Python, plateformes sans setitimer)
+        self.wall_timeout = cpu_timeout * 2 + 5
+        self.pool = None
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timeouts": 0,
+            "restarts": 0,
+            "queue_wait_total": 0.0,
+            "queue_wait_max": 0.0,
+            "exec_time_total": 0.0,
+            "exec_time_max": 0.0,
+        }
+
+    def start(self):
+        with self.lock:
+            if self.pool is None and self.max_workers > 0:
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self.pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(method),
+                    initializer=_init_worker,
+                    initargs=(self.warm_up, self.memory_limit),
+                )
+            return self.pool
+
+    def shutdown(self):
+        with self.lock:
+            pool, self.pool = self.pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def restart(self, pool):
+        """
+        Kill the workers of `pool` (runaway or broken) and start a fresh pool.
+        No-op if `pool` was already replaced: the jobs of several failures on
+        the same pool restart it once, and never kill its successor.
+        """
+        with self.lock:
+            if self.pool is not pool:
+                return
+            self.pool = None
+            self.metrics["restarts"] += 1
+        if hasattr(pool, "terminate_workers"):
+            pool.terminate_workers()
+        else:
+            for process in list((pool._processes or {}).values()):
+                process.terminate()
+            pool.shutdown(wait=False, cancel_futures=True)
+        self.start()
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) in the pool. Raises HTTP 503 when the queue is
+        full and 504 when the job exceeds its CPU-time budget.
+        """
+        if self.max_workers <= 0:
+            # Pool désactivé : comportement historique (threadpool)
+            from starlette.concurrency import run_in_threadpool
+            return await run_in_threadpool(fn, *args, **kwargs)
+        with self.lock:
+            if self.in_flight >= self.max_workers + self.max_queue:
+                self.metrics["rejected"] += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="Serveur de calcul saturé, réessayez plus tard.",
+                    headers={"Retry-After": "1"},
+                )
+            self.in_flight += 1
+            self.metrics["submitted"] += 1
+        submitted_at = time.time()
+        try:
+            pool = self.start()
+            future = pool.submit(_run_job, fn, args, kwargs, self.cpu_timeout)
+            try:
+                result, started_at, finished_at = await asyncio.wait_for(
+                    asyncio.wrap_future(future), timeout=self.wall_timeout
+                )
+            except asyncio.TimeoutError:
+                self._record_failure("timeouts")
+                logger.warning(f"Compute job {getattr(fn, '__name__', fn)} exceeded {self.wall_timeout}s, restarting pool")
+                self.restart(pool)
+                raise HTTPException(status_code=504, detail="Délai de calcul dépassé.")
+            except CPUTimeExceeded as e:
+                self._record_failure("timeouts")
+                raise HTTPException(status_code=504, detail=str(e))
+            except BrokenProcessPool:
+                self._record_failure("failed")
+                self.restart(pool)
+                raise HTTPException(status_code=503, detail="Le worker de calcul s'est arrêté, réessayez.")
+            except Exception:
+                self._record_failure("failed")
+                raise
+            with self.lock:
+                wait, exec_time = max(0.0, started_at - submitted_at), finished_at - started_at
+                self.metrics["completed"] += 1
+                self.metrics["queue_wait_total"] += wait
+                self.metrics["queue_wait_max"] = max(self.metrics["queue_wait_max"], wait)
+                self.metrics["exec_time_total"] += exec_time
+                self.metrics["exec_time_max"] = max(self.metrics["exec_time_max"], exec_time)
+            return result
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def _record_failure(self, counter):
+        with self.lock:
+            self.metrics[counter] += 1
+
+    def stats(self):
+        with self.lock:
+            completed = self.metrics["completed"]
+            return {
+                **self.metrics,
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "cpu_timeout": self.cpu_timeout,
+                "in_flight": self.in_flight,
+                "queue_wait_avg": self.metrics["queue_wait_total"] / completed if completed else 0.0,
+                "exec_time_avg": self.metrics["exec_time_total"] / completed if completed else 0.0,
+            }
+
+
+# Instance globale configurée par variables d'environnement (COMPUTE_WORKERS=0 désactive le pool)
+compute_executor = ComputeExecutor(
+    max_workers=int(os.getenv("COMPUTE_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    max_queue=int(os.getenv("COMPUTE_MAX_QUEUE", "16")),
+    cpu_timeout=float(os.getenv("COMPUTE_CPU_TIMEOUT", "30")),
+)
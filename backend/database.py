@@ -2,20 +2,187 @@ import sqlite3
 import os
 from typing import Dict, List, Optional, Any
 from datetime import datetime
+import asyncio
 import logging
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from lesson_content import backfill_lesson_blocks
+from module_progress import rebuild_module_progress
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Migrations versionnées du schéma (PRAGMA user_version), appliquées dans l'ordre après
+# create_tables ; une migration déjà appliquée n'est jamais rejouée.
+SCHEMA_MIGRATIONS = [
+    (1, "secondary indexes for the hot lookups", [
+        # utilisateur.email : déjà couvert par l'index implicite de la contrainte UNIQUE
+        "CREATE INDEX IF NOT EXISTS idx_lecon_module_actif ON lecon(id_module, actif)",
+        "CREATE INDEX IF NOT EXISTS idx_exercice_lecon_actif ON exercice(id_lecon) WHERE actif = 1",
+        "CREATE INDEX IF NOT EXISTS idx_exercice_enseignant ON exercice(id_enseignant)",
+        "CREATE INDEX IF NOT EXISTS idx_quiz_module ON quiz(id_module)",
+        "CREATE INDEX IF NOT EXISTS idx_quiz_question_quiz ON quiz_question(id_quiz)",
+        "CREATE INDEX IF NOT EXISTS idx_score_quiz_utilisateur_quiz ON score_quiz(id_utilisateur, id_quiz)",
+        "CREATE INDEX IF NOT EXISTS idx_progression_etudiant_lecon ON progression_etudiant(id_etudiant, id_lecon)",
+        "CREATE INDEX IF NOT EXISTS idx_linear_system_history_utilisateur"
+        " ON linear_system_history(id_utilisateur, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_calendar_events_enseignant ON calendar_events(id_enseignant)",
+        "CREATE INDEX IF NOT EXISTS idx_module_enseignant ON module(id_enseignant)",
+    ]),
+    (2, "lesson content blocks (lecon_bloc, lecon.has_video)", [
+        """
+        CREATE TABLE IF NOT EXISTS lecon_bloc (
+            id_lecon INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            type_bloc TEXT NOT NULL,
+            PRIMARY KEY (id_lecon, position),
+            FOREIGN KEY (id_lecon) REFERENCES lecon(id_lecon)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_lecon_bloc_type ON lecon_bloc(type_bloc, id_lecon)",
+        "ALTER TABLE lecon ADD COLUMN has_video BOOLEAN NOT NULL DEFAULT 0",
+        "CREATE INDEX IF NOT EXISTS idx_lecon_module_video ON lecon(id_module) WHERE has_video = 1",
+        backfill_lesson_blocks,
+    ]),
+    (3, "materialized per-student module progress", [
+        """
+        CREATE TABLE IF NOT EXISTS module_progress (
+            id_etudiant INTEGER NOT NULL,
+            id_module INTEGER NOT NULL,
+            video_progress_sum REAL NOT NULL DEFAULT 0,
+            videos_watched INTEGER NOT NULL DEFAULT 0,
+            quiz_score_sum REAL NOT NULL DEFAULT 0,
+            quiz_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (id_etudiant, id_module)
+        ) WITHOUT ROWID
+        """,
+        rebuild_module_progress,
+    ]),
+    (4, "one video progress row per (student, lesson), for the buffered upserts", [
+        # Doublons (écritures concurrentes) : on garde la ligne la plus récente
+        """
+        DELETE FROM progression_etudiant
+        WHERE id_etudiant IS NOT NULL AND id_lecon IS NOT NULL
+          AND id_progression NOT IN (
+              SELECT MAX(id_progression) FROM progression_etudiant
+              WHERE id_etudiant IS NOT NULL AND id_lecon IS NOT NULL
+              GROUP BY id_etudiant, id_lecon
+          )
+        """,
+        "DROP INDEX IF EXISTS idx_progression_etudiant_lecon",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_progression_etudiant_lecon ON progression_etudiant(id_etudiant, id_lecon)",
+        "ALTER TABLE progression_etudiant ADD COLUMN score_max INTEGER",
+        "UPDATE progression_etudiant SET score_max = score",
+        rebuild_module_progress,
+    ]),
+]
+
 class DatabaseManager:
+    """
+    SQLite access in WAL mode: one writer connection serialized by `lock`,
+    and a pool of read-only connections so that SELECTs from different
+    threads run concurrently.
+    """
+
     def __init__(self):
         self.db_path = os.getenv('SQLITE_DB_PATH', 'numiviz.db')
-        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.connection.row_factory = sqlite3.Row
-        self.lock = threading.Lock()
-        self.create_tables()
+        self.read_connections = int(os.getenv('DB_READ_CONNECTIONS', '4'))
+        self.busy_timeout_ms = int(os.getenv('DB_BUSY_TIMEOUT_MS', '2000'))
+        self.cache_size_kb = int(os.getenv('DB_CACHE_SIZE_KB', '16384'))
+        self.mmap_size = int(os.getenv('DB_MMAP_SIZE_MB', '64')) * 1024 * 1024
+        if self.db_path == ':memory:':
+            # Base en mémoire : chaque connexion aurait sa propre base
+            self.read_connections = 0
+        # Connexion d'écriture et schéma ouverts par open() (au démarrage de l'API ou au premier
+        # accès) et non à l'import : les workers de calcul qui réimportent __main__ n'y touchent pas
+        self._connection = None
+        self.open_lock = threading.Lock()
+        # Réentrant : une première requête, verrou pris, ouvre la base (create_tables / migrate)
+        self.lock = threading.RLock()
+        # Connexions de lecture créées à la demande, rendues au pool après chaque requête ;
+        # une connexion rendue est remise directement au plus ancien thread en attente
+        self.readers = []
+        self.readers_opened = 0
+        self.readers_waiting = deque()
+        self.readers_lock = threading.Lock()
+
+    def open(self):
+        """Connect the writer, then create and migrate the schema; no-op once open."""
+        with self.open_lock:
+            if self._connection is not None:
+                return
+            self._connection = self._connect()
+            try:
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self.create_tables()
+                self.migrate()
+            except Exception:
+                self._connection.close()
+                self._connection = None
+                raise
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            self.open()
+        return self._connection
+
+    @connection.setter
+    def connection(self, connection):
+        self._connection = connection
+
+    def _connect(self, read_only=False):
+        connection = sqlite3.connect(self.db_path, check_same_thread=False, timeout=self.busy_timeout_ms / 1000)
+        connection.row_factory = sqlite3.Row
+        connection.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(f"PRAGMA cache_size=-{self.cache_size_kb}")
+        connection.execute(f"PRAGMA mmap_size={self.mmap_size}")
+        connection.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            connection.execute("PRAGMA query_only=1")
+        return connection
+
+    @contextmanager
+    def read_connection(self):
+        """Check out a read connection for the calling thread (waits, in FIFO order, if all are in use)."""
+        if self._connection is None:
+            # Schéma créé / migré avant la première lecture
+            self.open()
+        waiter = None
+        with self.readers_lock:
+            if self.readers:
+                connection = self.readers.pop()
+            elif self.readers_opened < self.read_connections:
+                self.readers_opened += 1
+                connection = None
+            else:
+                waiter = [threading.Event(), None]
+                self.readers_waiting.append(waiter)
+        if waiter is not None:
+            waiter[0].wait()
+            connection = waiter[1]
+        elif connection is None:
+            try:
+                connection = self._connect(read_only=True)
+            except Exception:
+                with self.readers_lock:
+                    self.readers_opened -= 1
+                raise
+        try:
+            yield connection
+        finally:
+            with self.readers_lock:
+                if self.readers_waiting:
+                    waiter = self.readers_waiting.popleft()
+                    waiter[1] = connection
+                    waiter[0].set()
+                else:
+                    self.readers.append(connection)
 
     def create_tables(self):
         try:
@@ -222,7 +389,33 @@ class DatabaseManager:
             self.connection.rollback()
             raise
 
+    def migrate(self):
+        """Apply the SCHEMA_MIGRATIONS newer than the database's user_version, each in one transaction."""
+        with self.lock:
+            version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+            for target, description, statements in SCHEMA_MIGRATIONS:
+                if target <= version:
+                    continue
+                try:
+                    self.connection.execute("BEGIN")
+                    for statement in statements:
+                        # Étape Python (reprise des données) ou instruction SQL
+                        if callable(statement):
+                            statement(self.connection)
+                        else:
+                            self.connection.execute(statement)
+                    self.connection.execute(f"PRAGMA user_version = {target}")
+                    self.connection.commit()
+                except Exception as e:
+                    logger.error(f"Schema migration {target} failed: {e}")
+                    self.connection.rollback()
+                    raise
+                version = target
+                logger.info(f"Schema migration {target} applied: {description}")
+
     def execute_query(self, query: str, params: Optional[tuple] = None) -> List[Dict]:
+        if self.read_connections and query.strip().upper().startswith('SELECT'):
+            return self._execute_read(query, params)
         try:
             with self.lock:
                 cursor = self.connection.cursor()
@@ -243,10 +436,79 @@ class DatabaseManager:
             self.connection.rollback()
             raise
 
+    def run_in_transaction(self, fn, *args):
+        """Call fn(connection, *args) on the writer connection and commit its writes as one transaction."""
+        try:
+            with self.lock:
+                self.connection.execute("BEGIN")
+                try:
+                    result = fn(self.connection, *args)
+                    self.connection.commit()
+                except Exception:
+                    self.connection.rollback()
+                    raise
+                return result
+        except Exception as e:
+            logger.error(f"Error executing transaction: {e}")
+            raise
+
+    def read_snapshot(self, fn, *args):
+        """Call fn(connection, *args) inside one read transaction, so that its queries see the same snapshot."""
+        if not self.read_connections:
+            with self.lock:
+                return fn(self.connection, *args)
+        with self.read_connection() as connection:
+            connection.execute("BEGIN")
+            try:
+                return fn(connection, *args)
+            finally:
+                connection.rollback()
+
+    def _execute_read(self, query: str, params: Optional[tuple] = None) -> List[Dict]:
+        try:
+            with self.read_connection() as connection:
+                rows = connection.execute(query, params or ()).fetchall()
+                return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Error executing query: {e}")
+            raise
+
     def close(self):
-        if self.connection:
-            self.connection.close()
+        with self.readers_lock:
+            readers, self.readers = self.readers, []
+        for connection in readers:
+            connection.close()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
             logger.info("SQLite database connection closed")
 
+class AsyncDatabaseManager:
+    """
+    Awaitable front of a DatabaseManager: queries run on dedicated DB threads
+    (one per read connection plus the writer), so waiting handlers hold no
+    Starlette threadpool slot and concurrency is bounded by the database.
+    """
+
+    def __init__(self, manager: DatabaseManager):
+        self.manager = manager
+        self.executor = ThreadPoolExecutor(max_workers=manager.read_connections + 1, thread_name_prefix="db")
+
+    async def execute_query(self, query: str, params: Optional[tuple] = None) -> List[Dict]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.manager.execute_query, query, params)
+
+    async def run_in_transaction(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.manager.run_in_transaction, fn, *args)
+
+    async def read_snapshot(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.manager.read_snapshot, fn, *args)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
 # Global database instance
-db_manager = DatabaseManager() 
\ No newline at end of file
+db_manager = DatabaseManager()
+async_db_manager = AsyncDatabaseManager(db_manager) 
\ No newline at end of file
@@ -0,0 +1,331 @@
+import ast
+import math
+from functools import lru_cache
+
+import numpy as np
+
+# Compilateur d'expressions sûres en x (f(x), g(x) des méthodes non linéaires).
+# L'expression est analysée une seule fois, validée (liste blanche de nœuds et de
+# fonctions), puis compilée en une fonction Python/NumPy mise en cache par texte.
+# Les fonctions étant celles de NumPy, la même fonction s'évalue sur un tableau de x.
+
+EXPRESSION_CACHE_SIZE = 256
+MAX_EXPRESSION_LENGTH = 500
+VARIABLE = "x"
+
+
+def _log(x, base=None):
+    return np.log(x) if base is None else np.log(x) / np.log(base)
+
+
+FUNCTIONS = {
+    "sin": np.sin, "cos": np.cos, "tan": np.tan,
+    "arcsin": np.arcsin, "arccos": np.arccos, "arctan": np.arctan,
+    "asin": np.arcsin, "acos": np.arccos, "atan": np.arctan,
+    "sinh": np.sinh, "cosh": np.cosh, "tanh": np.tanh,
+    "arcsinh": np.arcsinh, "arccosh": np.arccosh, "arctanh": np.arctanh,
+    "asinh": np.arcsinh, "acosh": np.arccosh, "atanh": np.arctanh,
+    "exp": np.exp, "expm1": np.expm1, "log": _log, "log10": np.log10, "log2": np.log2,
+    "log1p": np.log1p, "sqrt": np.sqrt, "cbrt": np.cbrt, "abs": np.abs, "fabs": np.abs,
+    "floor": np.floor, "ceil": np.ceil, "sign": np.sign, "pow": np.power, "power": np.power,
+}
+# Nombre d'arguments (min, max) ; (1, 1) par défaut. Un second argument positionnel des
+# ufuncs NumPy est `out=` : sin(x, x) écraserait le tableau de x évalué
+ARITY = {"log": (1, 2), "pow": (2, 2), "power": (2, 2)}
+CONSTANTS = {"pi": math.pi, "e": math.e}
+# Préfixes acceptés : np.sin(x), numpy.sin(x), math.sin(x)
+MODULES = ("np", "numpy", "math")
+
+_BIN_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.FloorDiv)
+_UNARY_OPS = (ast.UAdd, ast.USub)
+
+
+class _Validator(ast.NodeTransformer):
+    """Reject anything outside the whitelist and normalize np./math. prefixes."""
+
+    def generic_visit(self, node):
+        raise ValueError(f"Élément non autorisé dans l'expression : {type(node).__name__}")
+
+    def visit_Expression(self, node):
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError(f"Constante non autorisée : {node.value!r}")
+        # Flottants seulement : pas d'entiers Python de taille arbitraire (9**9**9)
+        return ast.copy_location(ast.Constant(float(node.value)), node)
+
+    def visit_Name(self, node):
+        if node.id == VARIABLE:
+            return node
+        if node.id in CONSTANTS:
+            return ast.copy_location(ast.Constant(CONSTANTS[node.id]), node)
+        raise ValueError(f"Nom inconnu : {node.id}")
+
+    def visit_Attribute(self, node):
+        # np.pi / math.e -> constante
+        if isinstance(node.value, ast.Name) and node.value.id in MODULES and node.attr in CONSTANTS:
+            return ast.copy_location(ast.Constant(CONSTANTS[node.attr]), node)
+        raise ValueError("Attribut non autorisé dans l'expression.")
+
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, _BIN_OPS):
+            raise ValueError(f"Opérateur non autorisé : {type(node.op).__name__}")
+        node.left = self.visit(node.left)
+        node.right = self.visit(node.right)
+        return node
+
+    def visit_UnaryOp(self, node):
+        if not isinstance(node.op, _UNARY_OPS):
+            raise ValueError(f"Opérateur non autorisé : {type(node.op).__name__}")
+        node.operand = self.visit(node.operand)
+        return node
+
+    def visit_Call(self, node):
+        func = node.func
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id in MODULES:
+            name = func.attr
+        elif isinstance(func, ast.Name):
+            name = func.id
+        else:
+            raise ValueError("Appel de fonction non autorisé.")
+        if name not in FUNCTIONS:
+            raise ValueError(f"Fonction inconnue : {name}")
+        low, high = ARITY.get(name, (1, 1))
+        if node.keywords or not low <= len(node.args) <= high:
+            raise ValueError(f"Arguments invalides pour {name}.")
+        node.func = ast.copy_location(ast.Name(id=name, ctx=ast.Load()), func)
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+
+def parse_expression(text):
+    """
+    Parse and validate `text` (with ^ accepted for **); returns the AST.
+
+    >>> parse_expression("sin(x, x)")
+    Traceback (most recent call last):
+        ...
+    ValueError: Arguments invalides pour sin.
+    """
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("L'expression est vide.")
+    if len(text) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(f"L'expression dépasse {MAX_EXPRESSION_LENGTH} caractères.")
+    source = text.replace("^", "**").strip()
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Expression invalide : {e.msg}")
+    return ast.fix_missing_locations(_Validator().visit(tree))
+
+
+def compile_tree(tree):
+    """Compile a validated expression AST into `lambda x: ...`."""
+    args = ast.arguments(
+        posonlyargs=[], args=[ast.arg(arg=VARIABLE)], vararg=None,
+        kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[],
+    )
+    lam = ast.Expression(body=ast.Lambda(args=args, body=tree.body))
+    code = compile(ast.fix_missing_locations(lam), "<expression>", "eval")
+    return eval(code, {"__builtins__": {}, **FUNCTIONS})
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(text):
+    """Cached f(x) for the expression `text`; works on floats and NumPy arrays."""
+    return compile_tree(parse_expression(text))
+
+
+# --- Dérivée symbolique (pour Newton) ---
+def _const(value):
+    return ast.Constant(float(value))
+
+
+def _is_const(node, value=None):
+    return isinstance(node, ast.Constant) and (value is None or node.value == value)
+
+
+def _add(a, b):
+    if _is_const(a, 0):
+        return b
+    if _is_const(b, 0):
+        return a
+    if _is_const(a) and _is_const(b):
+        return _const(a.value + b.value)
+    return ast.BinOp(a, ast.Add(), b)
+
+
+def _neg(a):
+    if _is_const(a):
+        return _const(-a.value)
+    return ast.UnaryOp(ast.USub(), a)
+
+
+def _sub(a, b):
+    if _is_const(b, 0):
+        return a
+    if _is_const(a, 0):
+        return _neg(b)
+    if _is_const(a) and _is_const(b):
+        return _const(a.value - b.value)
+    return ast.BinOp(a, ast.Sub(), b)
+
+
+def _mul(a, b):
+    if _is_const(a, 0) or _is_const(b, 0):
+        return _const(0)
+    if _is_const(a, 1):
+        return b
+    if _is_const(b, 1):
+        return a
+    if _is_const(a) and _is_const(b):
+        return _const(a.value * b.value)
+    return ast.BinOp(a, ast.Mult(), b)
+
+
+def _div(a, b):
+    if _is_const(a, 0):
+        return _const(0)
+    if _is_const(b, 1):
+        return a
+    return ast.BinOp(a, ast.Div(), b)
+
+
+def _pow(a, b):
+    if _is_const(b, 1):
+        return a
+    if _is_const(b, 0):
+        return _const(1)
+    return ast.BinOp(a, ast.Pow(), b)
+
+
+def _call(name, *args):
+    return ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=list(args), keywords=[])
+
+
+def _inv_sqrt(a):
+    return _div(_const(1), _call("sqrt", a))
+
+
+# f'(u) pour chaque fonction de FUNCTIONS à un argument (règle de chaîne appliquée ensuite)
+_DERIVATIVES = {
+    "sin": lambda u: _call("cos", u),
+    "cos": lambda u: _neg(_call("sin", u)),
+    "tan": lambda u: _div(_const(1), _pow(_call("cos", u), _const(2))),
+    "arcsin": lambda u: _inv_sqrt(_sub(_const(1), _pow(u, _const(2)))),
+    "arccos": lambda u: _neg(_inv_sqrt(_sub(_const(1), _pow(u, _const(2))))),
+    "arctan": lambda u: _div(_const(1), _add(_const(1), _pow(u, _const(2)))),
+    "sinh": lambda u: _call("cosh", u),
+    "cosh": lambda u: _call("sinh", u),
+    "tanh": lambda u: _sub(_const(1), _pow(_call("tanh", u), _const(2))),
+    "arcsinh": lambda u: _inv_sqrt(_add(_pow(u, _const(2)), _const(1))),
+    "arccosh": lambda u: _inv_sqrt(_sub(_pow(u, _const(2)), _const(1))),
+    "arctanh": lambda u: _div(_const(1), _sub(_const(1), _pow(u, _const(2)))),
+    "exp": lambda u: _call("exp", u),
+    "expm1": lambda u: _call("exp", u),
+    "log": lambda u: _div(_const(1), u),
+    "log10": lambda u: _div(_const(1), _mul(u, _const(math.log(10)))),
+    "log2": lambda u: _div(_const(1), _mul(u, _const(math.log(2)))),
+    "log1p": lambda u: _div(_const(1), _add(_const(1), u)),
+    "sqrt": lambda u: _div(_const(1), _mul(_const(2), _call("sqrt", u))),
+    "cbrt": lambda u: _div(_const(1), _mul(_const(3), _pow(_call("cbrt", u), _const(2)))),
+    "abs": lambda u: _call("sign", u),
+    # Constantes par morceaux : dérivée nulle presque partout
+    "floor": lambda u: _const(0),
+    "ceil": lambda u: _const(0),
+    "sign": lambda u: _const(0),
+}
+_ALIASES = {
+    "asin": "arcsin", "acos": "arccos", "atan": "arctan",
+    "asinh": "arcsinh", "acosh": "arccosh", "atanh": "arctanh", "fabs": "abs",
+}
+
+
+def differentiate(node):
+    """
+    d/dx of a validated expression node, as a new (lightly simplified) node.
+    Raises ValueError for constructs without a usable symbolic derivative.
+    """
+    if isinstance(node, ast.Expression):
+        return ast.Expression(body=differentiate(node.body))
+    if isinstance(node, ast.Constant):
+        return _const(0)
+    if isinstance(node, ast.Name):
+        return _const(1)
+    if isinstance(node, ast.UnaryOp):
+        du = differentiate(node.operand)
+        return _neg(du) if isinstance(node.op, ast.USub) else du
+    if isinstance(node, ast.BinOp):
+        u, v = node.left, node.right
+        if isinstance(node.op, ast.Add):
+            return _add(differentiate(u), differentiate(v))
+        if isinstance(node.op, ast.Sub):
+            return _sub(differentiate(u), differentiate(v))
+        if isinstance(node.op, ast.Mult):
+            return _add(_mul(differentiate(u), v), _mul(u, differentiate(v)))
+        if isinstance(node.op, ast.Div):
+            du, dv = differentiate(u), differentiate(v)
+            if _is_const(dv, 0):
+                return _div(du, v)
+            return _div(_sub(_mul(du, v), _mul(u, dv)), _pow(v, _const(2)))
+        if isinstance(node.op, ast.Pow):
+            return _differentiate_pow(u, v)
+        raise ValueError(f"Pas de dérivée symbolique pour l'opérateur {type(node.op).__name__}.")
+    if isinstance(node, ast.Call):
+        name = _ALIASES.get(node.func.id, node.func.id)
+        if name in ("pow", "power") and len(node.args) == 2:
+            return _differentiate_pow(*node.args)
+        if name == "log" and len(node.args) == 2:
+            # log(u, base) = log(u) / log(base)
+            u, base = node.args
+            return differentiate(ast.BinOp(_call("log", u), ast.Div(), _call("log", base)))
+        if name not in _DERIVATIVES or len(node.args) != 1:
+            raise ValueError(f"Pas de dérivée symbolique pour {name}.")
+        u = node.args[0]
+        return _mul(_DERIVATIVES[name](u), differentiate(u))
+    raise ValueError(f"Pas de dérivée symbolique pour {type(node).__name__}.")
+
+
+def _differentiate_pow(u, v):
+    du, dv = differentiate(u), differentiate(v)
+    if _is_const(dv, 0):
+        # (u^c)' = c u^(c-1) u'
+        return _mul(_mul(v, _pow(u, _sub(v, _const(1)))), du)
+    if _is_const(du, 0):
+        # (a^v)' = a^v log(a) v'
+        return _mul(_mul(ast.BinOp(u, ast.Pow(), v), _call("log", u)), dv)
+    # (u^v)' = u^v (v' log(u) + v u' / u)
+    return _mul(
+        ast.BinOp(u, ast.Pow(), v),
+        _add(_mul(dv, _call("log", u)), _div(_mul(v, du), u)),
+    )
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_derivative(text, order=1):
+    """Cached derivative of order `order` derived symbolically from `text`, or None if not derivable."""
+    tree = parse_expression(text)
+    try:
+        for _ in range(order):
+            tree = differentiate(tree)
+    except ValueError:
+        return None
+    return compile_tree(tree)
+
+
+def evaluate(f, x):
+    """f(x) with evaluation errors reported as ValueError."""
+    try:
+        return f(x)
+    except (ArithmeticError, ValueError, TypeError) as e:
+        raise ValueError(f"Erreur d'évaluation: {e}")
+
+
+def evaluate_many(f, xs):
+    """Vectorized f over the array `xs` (a constant expression is broadcast)."""
+    xs = np.asarray(xs, dtype=float)
+    with np.errstate(all="ignore"):
+        values = evaluate(f, xs)
+    return np.broadcast_to(np.asarray(values, dtype=float), xs.shape)
@@ -0,0 +1,251 @@
+import io
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve, lu_factor, lu_solve, qr, solve_triangular
+
+logger = logging.getLogger(__name__)
+
+# Factorisations conservées sous un identifiant (handle) pour résoudre Ax = b
+# plusieurs fois sans refactoriser A : O(n^2) par second membre au lieu de O(n^3).
+# En mémoire du worker, avec un niveau SQLite optionnel partagé entre workers : sans lui,
+# un handle n'est connu que du worker qui l'a créé.
+
+FACTOR_KINDS = ("lu", "cholesky", "qr")
+
+_SHARED_ENTRY_QUERY = (
+    "SELECT kind, n, nbytes, factors, expires_at FROM factor_store WHERE handle = ? AND expires_at > ?"
+)
+_SHARED_LIVE_QUERY = "SELECT expires_at FROM factor_store WHERE handle = ? AND expires_at > ?"
+
+
+def factorize(kind, A):
+    """Return (factors, nbytes) for the requested factorization of A."""
+    A = np.asarray(A, dtype=float)
+    if A.ndim != 2 or A.shape[0] != A.shape[1]:
+        raise ValueError("La matrice doit être carrée.")
+    if kind == "lu":
+        lu, piv = lu_factor(A)
+        if np.any(np.diag(lu) == 0):
+            raise ValueError("Matrix is singular.")
+        return (lu, piv), lu.nbytes + piv.nbytes
+    if kind == "cholesky":
+        c, lower = cho_factor(A)
+        return (c, lower), c.nbytes
+    if kind == "qr":
+        Q, R = qr(A)
+        if np.any(np.diag(R) == 0):
+            raise ValueError("Matrix is singular.")
+        return (Q, R), Q.nbytes + R.nbytes
+    raise ValueError(f"Factorisation non supportée: {kind}")
+
+
+def solve_factored(kind, factors, B):
+    """Solve for every column of B (n or n x k) in one batched call."""
+    if kind == "lu":
+        return lu_solve(factors, B, check_finite=False)
+    if kind == "cholesky":
+        return cho_solve(factors, B, check_finite=False)
+    Q, R = factors
+    return solve_triangular(R, Q.T @ B, check_finite=False)
+
+
+def pack_factors(factors):
+    """Serialize factors to .npz bytes (arrays only, no pickle)."""
+    buffer = io.BytesIO()
+    np.savez(buffer, *[np.asarray(part) for part in factors])
+    return buffer.getvalue()
+
+
+def unpack_factors(kind, blob):
+    with np.load(io.BytesIO(blob), allow_pickle=False) as data:
+        parts = [data[f"arr_{i}"] for i in range(len(data.files))]
+    if kind == "cholesky":
+        return parts[0], bool(parts[1])
+    return tuple(parts)
+
+
+class FactorStore:
+    def __init__(self, ttl=600.0, max_bytes=256 * 1024 * 1024, db_path=None):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # handle -> dict(kind, factors, n, nbytes, expires_at)
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.connection = None
+        if db_path:
+            self.connection = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+            self.db_lock = threading.Lock()
+            with self.db_lock:
+                self.connection.execute("PRAGMA journal_mode=WAL")
+                self.connection.execute("""
+                    CREATE TABLE IF NOT EXISTS factor_store (
+                        handle TEXT PRIMARY KEY,
+                        kind TEXT NOT NULL,
+                        n INTEGER NOT NULL,
+                        nbytes INTEGER NOT NULL,
+                        factors BLOB NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                """)
+                self.connection.commit()
+
+    def put(self, kind, A, ttl=None):
+        """Factor A and keep it for `ttl` seconds (> 0, capped at the store's ttl)."""
+        if ttl is not None and not ttl > 0:
+            raise ValueError("ttl doit être strictement positif.")
+        factors, nbytes = factorize(kind, A)
+        if nbytes > self.max_bytes:
+            raise MemoryError("La factorisation dépasse le budget mémoire du serveur.")
+        handle = secrets.token_urlsafe(16)
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        entry = {
+            "kind": kind,
+            "factors": factors,
+            "n": len(A),
+            "nbytes": nbytes,
+            "expires_at": time.time() + ttl,
+        }
+        with self.lock:
+            self._store(handle, entry)
+        self._db_put(handle, entry)
+        return handle, entry
+
+    def get(self, handle):
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(handle)
+            if entry is not None and entry["expires_at"] <= now:
+                self._drop(handle)
+                entry = None
+        if self.connection is not None:
+            # La ligne partagée fait foi : un handle supprimé par un autre worker n'est plus servi
+            found, shared = self._db_get(handle, now, load=entry is None)
+            if not found:
+                with self.lock:
+                    if handle in self.entries:
+                        self._drop(handle)
+                raise KeyError(handle)
+            if entry is None:
+                entry = shared
+                with self.lock:
+                    self._store(handle, entry)
+        if entry is None:
+            raise KeyError(handle)
+        with self.lock:
+            if handle in self.entries:
+                self.entries.move_to_end(handle)
+        return entry
+
+    def solve(self, handle, B):
+        entry = self.get(handle)
+        B = np.asarray(B, dtype=float)
+        if B.shape[0] != entry["n"]:
+            raise ValueError(f"Le second membre doit avoir {entry['n']} lignes.")
+        return solve_factored(entry["kind"], entry["factors"], B)
+
+    def delete(self, handle):
+        with self.lock:
+            found = handle in self.entries
+            if found:
+                self._drop(handle)
+        if self._db_delete(handle):
+            found = True
+        if not found:
+            raise KeyError(handle)
+
+    def _store(self, handle, entry):
+        self._purge_expired()
+        # Éviction LRU jusqu'à respecter le budget mémoire
+        while self.entries and self.total_bytes + entry["nbytes"] > self.max_bytes:
+            _, old = self.entries.popitem(last=False)
+            self.total_bytes -= old["nbytes"]
+        self.entries[handle] = entry
+        self.total_bytes += entry["nbytes"]
+
+    def _drop(self, handle):
+        entry = self.entries.pop(handle)
+        self.total_bytes -= entry["nbytes"]
+
+    def _purge_expired(self):
+        now = time.time()
+        for handle in [h for h, e in self.entries.items() if e["expires_at"] <= now]:
+            self._drop(handle)
+
+    def _db_get(self, handle, now, load=True):
+        """(found, entry) from the shared table; entry is only decoded when `load` is set."""
+        query = _SHARED_ENTRY_QUERY if load else _SHARED_LIVE_QUERY
+        try:
+            with self.db_lock:
+                row = self.connection.execute(query, (handle, now)).fetchone()
+        except sqlite3.Error as e:
+            # Table indisponible : la copie locale éventuelle reste servie
+            logger.warning(f"Factor store read failed: {e}")
+            return not load, None
+        if row is None:
+            return False, None
+        if not load:
+            return True, None
+        kind, n, nbytes, blob, expires_at = row
+        entry = {
+            "kind": kind,
+            "factors": unpack_factors(kind, blob),
+            "n": n,
+            "nbytes": nbytes,
+            "expires_at": expires_at,
+        }
+        return True, entry
+
+    def _db_put(self, handle, entry):
+        if self.connection is None:
+            return
+        try:
+            with self.db_lock:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO factor_store (handle, kind, n, nbytes, factors, expires_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (handle, entry["kind"], entry["n"], entry["nbytes"], pack_factors(entry["factors"]),
+                     entry["expires_at"]),
+                )
+                self.connection.execute("DELETE FROM factor_store WHERE expires_at <= ?", (time.time(),))
+                # Même budget pour la table, en retirant d'abord ce qui expire le plus tôt
+                total = self.connection.execute("SELECT COALESCE(SUM(nbytes), 0) FROM factor_store").fetchone()[0]
+                if total > self.max_bytes:
+                    for old, nbytes in self.connection.execute(
+                        "SELECT handle, nbytes FROM factor_store WHERE handle != ? ORDER BY expires_at", (handle,)
+                    ).fetchall():
+                        if total <= self.max_bytes:
+                            break
+                        self.connection.execute("DELETE FROM factor_store WHERE handle = ?", (old,))
+                        total -= nbytes
+                self.connection.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Factor store write failed: {e}")
+
+    def _db_delete(self, handle):
+        if self.connection is None:
+            return False
+        try:
+            with self.db_lock:
+                deleted = self.connection.execute(
+                    "DELETE FROM factor_store WHERE handle = ? AND expires_at > ?", (handle, time.time())
+                ).rowcount
+                self.connection.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Factor store delete failed: {e}")
+            return False
+        return deleted > 0
+
+
+# Instance globale configurée par variables d'environnement
+factor_store = FactorStore(
+    ttl=float(os.getenv("FACTOR_CACHE_TTL", "600")),
+    max_bytes=int(os.getenv("FACTOR_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+    db_path=os.getenv("FACTOR_CACHE_DB") or None,
+)
@@ -0,0 +1,237 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.linalg import solve_triangular
+from scipy.sparse.linalg import spsolve_triangular
+
+# Méthodes itératives (Jacobi, Gauss-Seidel, SOR, SSOR) partagées par les endpoints de résolution.
+# Chaque balayage est une seule expression NumPy au lieu d'une boucle Python par ligne.
+# A peut être un tableau dense ou une matrice scipy.sparse (coût proportionnel à nnz).
+
+MAX_ITER = 50
+TOL = 1e-8
+# Arrêt anticipé : erreur non finie / trop grande, ou sans amélioration pendant STAGNATION_WINDOW balayages
+OVERFLOW = 1e100
+STAGNATION_WINDOW = 10
+# Pré-vérification : test SPD (Cholesky, O(n^3)) jusqu'à SPD_CHECK_MAX inconnues, puis rayon
+# spectral estimé par POWER_STEPS pas de puissance itérée (un balayage chacun, jamais de valeurs
+# propres), concluant seulement au-dessus de 1 + DIVERGENCE_MARGIN
+SPD_CHECK_MAX = 200
+POWER_STEPS = 100
+DIVERGENCE_MARGIN = 0.1
+
+ITERATIVE_METHODS = ("jacobi", "gauss-seidel", "sor", "ssor")
+
+
+def _splitting(A):
+    """Return (A, d, L, U, is_sparse) with A = D + L + U."""
+    if sp.issparse(A):
+        A = sp.csr_matrix(A, dtype=float)
+        return A, A.diagonal(), sp.tril(A, -1, format="csr"), sp.triu(A, 1, format="csr"), True
+    A = np.asarray(A, dtype=float)
+    return A, np.diag(A), np.tril(A, -1), np.triu(A, 1), False
+
+
+def _diag(d, is_sparse):
+    return sp.diags(d, format="csr") if is_sparse else np.diag(d)
+
+
+def _triangular_solver(M, lower, is_sparse):
+    if is_sparse:
+        return lambda rhs: spsolve_triangular(M, rhs, lower=lower)
+    return lambda rhs: solve_triangular(M, rhs, lower=lower, check_finite=False)
+
+
+def jacobi_step(A, b, omega=1.0):
+    """x -> D^-1 (b - (L+U) x)."""
+    A, d, _, _, is_sparse = _splitting(A)
+    R = A - _diag(d, is_sparse)
+    b = np.asarray(b, dtype=float)
+    return lambda x: (b - R @ x) / d
+
+
+def sor_step(A, b, omega=1.0):
+    """
+    x -> (D + wL)^-1 (w b + ((1-w) D - w U) x), solved as a lower triangular
+    system. omega = 1 is Gauss-Seidel.
+    """
+    A, d, L, U, is_sparse = _splitting(A)
+    D = _diag(d, is_sparse)
+    M = D + omega * L
+    N = (1 - omega) * D - omega * U
+    if is_sparse:
+        M, N = sp.csr_matrix(M), sp.csr_matrix(N)
+    rhs0 = omega * np.asarray(b, dtype=float)
+    lower_solve = _triangular_solver(M, True, is_sparse)
+    return lambda x: lower_solve(rhs0 + N @ x)
+
+
+def gauss_seidel_step(A, b, omega=1.0):
+    return sor_step(A, b, 1.0)
+
+
+def ssor_step(A, b, omega=1.0):
+    """Forward SOR sweep followed by a backward sweep (D + wU) on the upper part."""
+    A, d, L, U, is_sparse = _splitting(A)
+    D = _diag(d, is_sparse)
+    M = D + omega * U
+    N = (1 - omega) * D - omega * L
+    if is_sparse:
+        M, N = sp.csr_matrix(M), sp.csr_matrix(N)
+    rhs0 = omega * np.asarray(b, dtype=float)
+    forward = sor_step(A, b, omega)
+    upper_solve = _triangular_solver(M, False, is_sparse)
+    return lambda x: upper_solve(rhs0 + N @ forward(x))
+
+
+STEPS = {
+    "jacobi": jacobi_step,
+    "gauss-seidel": gauss_seidel_step,
+    "sor": sor_step,
+    "ssor": ssor_step,
+}
+
+
+def sweeps(method, A, b, x0, max_iter=MAX_ITER, tol=TOL, omega=1.0):
+    """
+    Yield (x_new, err, status) for each sweep. status is None while iterating
+    and, on the last sweep, one of "converged", "diverged", "stagnated" or
+    "max_iter".
+    """
+    step = STEPS[method](A, b, omega)
+    x = np.array(x0, dtype=float)
+    best = np.inf
+    since_best = 0
+    for it in range(1, max_iter + 1):
+        x_new = step(x)
+        err = np.linalg.norm(x_new - x, 2)
+        if err < tol:
+            status = "converged"
+        elif not np.isfinite(err) or err > OVERFLOW:
+            status = "diverged"
+        else:
+            if err < best:
+                best, since_best = err, 0
+            else:
+                since_best += 1
+            if since_best >= STAGNATION_WINDOW:
+                status = "stagnated"
+            elif it == max_iter:
+                status = "max_iter"
+            else:
+                status = None
+        yield x_new, err, status
+        if status:
+            break
+        x = x_new
+
+
+def spectral_radius(method, A, omega=1.0, steps=POWER_STEPS):
+    """
+    Estimate the spectral radius of the iteration matrix with power iteration
+    steps (geometric mean of the growth over the second half). Only an
+    estimate: it can overshoot for non-normal iteration matrices.
+    """
+    n = A.shape[0]
+    apply_T = STEPS[method](A, np.zeros(n), omega)
+    x = np.random.default_rng(0).standard_normal(n)
+    x /= np.linalg.norm(x)
+    logs = []
+    for _ in range(steps):
+        # Débordement attendu pour une itération très divergente (rayon infini)
+        with np.errstate(over="ignore", invalid="ignore"):
+            y = apply_T(x)
+            norm = np.linalg.norm(y)
+        if norm == 0:
+            return 0.0
+        if not np.isfinite(norm):
+            return float("inf")
+        logs.append(np.log(norm))
+        x = y / norm
+    return float(np.exp(np.mean(logs[steps // 2:])))
+
+
+def strictly_diagonally_dominant(A):
+    if sp.issparse(A):
+        A = sp.csr_matrix(A)
+        d = np.abs(A.diagonal())
+        off = np.asarray(abs(A).sum(axis=1)).ravel() - d
+    else:
+        d = np.abs(np.diag(A))
+        off = np.abs(A).sum(axis=1) - d
+    return bool(np.all(d > off))
+
+
+def symmetric_positive_definite(A):
+    """Symmetric with a Cholesky factorization; False above SPD_CHECK_MAX unknowns (not checked)."""
+    if A.shape[0] > SPD_CHECK_MAX:
+        return False
+    if sp.issparse(A):
+        A = A.toarray()
+    A = np.asarray(A, dtype=float)
+    if not np.allclose(A, A.T):
+        return False
+    try:
+        np.linalg.cholesky(A)
+    except np.linalg.LinAlgError:
+        return False
+    return True
+
+
+def check_convergence(method, A, omega=1.0):
+    """
+    Convergence test run before iterating. "converges" is True or False only
+    on conclusive evidence (zero diagonal, omega out of ]0, 2[, diagonal
+    dominance, SPD matrix with Gauss-Seidel/SOR/SSOR, power iteration
+    estimate clearly above 1); otherwise it is None and the sweeps stop by
+    themselves if they diverge.
+    """
+    d = A.diagonal() if sp.issparse(A) else np.diag(A)
+    if np.any(d == 0):
+        return {"converges": False, "criterion": "zero_diagonal", "spectral_radius": None}
+    if method in ("sor", "ssor") and not 0 < omega < 2:
+        return {"converges": False, "criterion": "omega_range", "spectral_radius": None}
+    if omega <= 1 and strictly_diagonally_dominant(A):
+        return {"converges": True, "criterion": "diagonal_dominance", "spectral_radius": None}
+    if method != "jacobi" and symmetric_positive_definite(A):
+        return {"converges": True, "criterion": "spd", "spectral_radius": None}
+    rho = spectral_radius(method, A, omega)
+    converges = False if rho > 1 + DIVERGENCE_MARGIN else None
+    return {"converges": converges, "criterion": "spectral_radius_estimate", "spectral_radius": rho}
+
+
+def ensure_convergent(method, A, omega=1.0):
+    """Raise ValueError when the method provably diverges; inconclusive checks let it run."""
+    check = check_convergence(method, A, omega)
+    if check["converges"] is not False:
+        return check
+    if check["criterion"] == "zero_diagonal":
+        raise ValueError("La diagonale de A contient un zéro : la méthode n'est pas applicable.")
+    if check["criterion"] == "omega_range":
+        raise ValueError("omega doit être dans ]0, 2[ pour SOR/SSOR.")
+    raise ValueError(
+        f"La méthode {method} ne converge pas pour cette matrice "
+        f"(rayon spectral ≈ {check['spectral_radius']:.4g} ≥ 1)."
+    )
+
+
+def iterative_solve(method, A, b, x0=None, max_iter=MAX_ITER, tol=TOL, omega=1.0):
+    """
+    Run the iterative method and return (solution, steps, convergence, status)
+    in the format expected by /system/solve.
+    """
+    x = np.zeros(A.shape[0]) if x0 is None else np.array(x0, dtype=float)
+    steps = [f"Initial guess: {x.tolist()}"]
+    convergence = []
+    status = None
+    for it, (x_new, err, status) in enumerate(sweeps(method, A, b, x, max_iter, tol, omega)):
+        steps.append(f"Iter {it+1}: {x_new.tolist()} (err={err})")
+        convergence.append(float(err))
+        if status == "converged":
+            break
+        x = x_new
+    return x.tolist(), steps, convergence, status
+
+
+def convergence_errors(method, A, b, x0, max_iter=MAX_ITER, tol=TOL, omega=1.0):
+    """Return only the per-iteration errors (no step strings)."""
+    return [float(err) for _, err, _ in sweeps(method, A, b, x0, max_iter, tol, omega)]
@@ -0,0 +1,37 @@
+import json
+
+# Normalisation du contenu des leçons à l'écriture : les types des blocs (liste JSON
+# [{"type": ..., "content": ...}, ...] de l'éditeur) sont copiés dans lecon_bloc et
+# lecon.has_video, pour que les requêtes de progression n'analysent plus le texte JSON.
+
+VIDEO_BLOCK_TYPES = ("video", "video_manim")
+
+
+def block_types(contenu):
+    """Types of the content blocks, in order; [] for plain text (e.g. Markdown) lessons."""
+    try:
+        blocks = json.loads(contenu)
+    except (TypeError, ValueError):
+        return []
+    if not isinstance(blocks, list):
+        return []
+    return [block["type"] for block in blocks if isinstance(block, dict) and isinstance(block.get("type"), str)]
+
+
+def save_lesson_blocks(connection, lesson_id, contenu):
+    """Replace the lecon_bloc rows and has_video flag of a lesson (inside the caller's transaction)."""
+    types = block_types(contenu)
+    connection.execute("DELETE FROM lecon_bloc WHERE id_lecon = ?", (lesson_id,))
+    connection.executemany(
+        "INSERT INTO lecon_bloc (id_lecon, position, type_bloc) VALUES (?, ?, ?)",
+        [(lesson_id, position, block_type) for position, block_type in enumerate(types)],
+    )
+    has_video = any(block_type in VIDEO_BLOCK_TYPES for block_type in types)
+    connection.execute("UPDATE lecon SET has_video = ? WHERE id_lecon = ?", (int(has_video), lesson_id))
+
+
+def backfill_lesson_blocks(connection):
+    """Schema migration step: normalize the lessons written before lecon_bloc existed."""
+    rows = connection.execute("SELECT id_lecon, contenu FROM lecon").fetchall()
+    for lesson_id, contenu in rows:
+        save_lesson_blocks(connection, lesson_id, contenu)
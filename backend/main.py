@@ -1,24 +1,19 @@
-from fastapi import FastAPI, HTTPException, Depends, status, Response, File, UploadFile, Form, Request
-from pydantic import BaseModel
-from typing import Optional
+from fastapi import FastAPI, HTTPException, Depends, status, Response, File, UploadFile, Form, Request, Query
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+from typing import Literal, Optional, Union
 import re
 from fastapi.staticfiles import StaticFiles
 from typing import List
-from models import User, Module, Lesson, Exercise, Quiz, QuizQuestion, QuizAttemptQuestion, QuizAttemptRequest, QuizAttemptResponse
-from database import db_manager
+from models import User, Module, Lesson, Exercise, Quiz, QuizProjection, QuizQuestion, QuizAttemptQuestion, QuizAttemptRequest, QuizAttemptResponse
+from database import async_db_manager, db_manager
 import logging
 from fastapi.middleware.cors import CORSMiddleware
 import json
 import hashlib
 import secrets
 from pydantic import BaseModel
-import matplotlib
 import os
-matplotlib.use('Agg')  # Use non-GUI backend
-import matplotlib.pyplot as plt
-import numpy as np
-import io
-import sys
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("database")
@@ -27,6 +22,16 @@ app = FastAPI()
 
 # --- Import et inclusion des routers ---
 from matrix_router import router as matrix_router
+from compute_pool import compute_executor
+from plotting import DATA_MAX_POINTS, RASTERIZE_THRESHOLD, plot_executor, record_plot, render_plot
+from plot_cache import plot_cache, plot_cache_key
+from quiz_repository import parse_fields, quiz_repository
+from query_advisor import check_queries
+from lesson_content import save_lesson_blocks
+from module_progress import (
+    apply_quiz_score, read_module_progress, rebuild_module_progress, summarize as summarize_module_progress,
+)
+from progress_buffer import progress_buffer
 from routes.calendar_routes import router as calendar_router
 from routes.dashboard_routes import router as dashboard_router
 
@@ -60,8 +65,6 @@ app.add_middleware(
     max_age=600,  # cache preflight request for 10 minutes
 )
 
-db_manager.create_tables()
-
 def hash_password(password: str) -> str:
     """Hash a password using SHA-256 with salt"""
     salt = secrets.token_hex(16)
@@ -77,16 +80,32 @@ def verify_password(password: str, hashed_password: str) -> bool:
     except:
         return False
 
+@app.on_event("startup")
+async def startup_event():
+    # Base ouverte et migrée au démarrage, pas à l'import : les workers des pools de calcul
+    # réimportent le module principal
+    db_manager.open()
+    # Diagnostic : requêtes des routes dont le plan parcourt toute une table
+    if os.getenv("DB_EXPLAIN_QUERIES", "0") == "1":
+        with db_manager.lock:
+            check_queries(db_manager.connection)
+    progress_buffer.start()
+
 @app.on_event("shutdown")
-def shutdown_event():
+async def shutdown_event():
+    # Progression vidéo encore en mémoire écrite avant la fermeture de la base
+    await progress_buffer.close()
+    compute_executor.shutdown()
+    plot_executor.shutdown()
+    async_db_manager.close()
     db_manager.close()
 
 @app.post("/users", response_model=User)
-def create_user(user: User):
+async def create_user(user: User):
     try:
         # Check if user already exists
         check_query = "SELECT * FROM utilisateur WHERE email = ?"
-        existing_user = db_manager.execute_query(check_query, (user.email,))
+        existing_user = await async_db_manager.execute_query(check_query, (user.email,))
         if existing_user:
             raise HTTPException(status_code=400, detail="Un utilisateur avec cet email existe déjà")
         
@@ -99,10 +118,10 @@ def create_user(user: User):
             INSERT INTO utilisateur (nom, email, mot_de_passe, role)
             VALUES (?, ?, ?, ?)
         """
-        db_manager.execute_query(query, (user.name, user.email, hashed_password, user.role))
+        await async_db_manager.execute_query(query, (user.name, user.email, hashed_password, user.role))
         # Fetch the created user
         get_query = "SELECT * FROM utilisateur WHERE email = ?"
-        result = db_manager.execute_query(get_query, (user.email,))
+        result = await async_db_manager.execute_query(get_query, (user.email,))
         if result:
             row = result[0]
             return User(id=row['id_utilisateur'], name=row['nom'], email=row['email'], role=row['role'])
@@ -119,11 +138,11 @@ class LoginRequest(BaseModel):
     password: str
 
 @app.post("/auth/login")
-def login_user(login_data: LoginRequest):
+async def login_user(login_data: LoginRequest):
     try:
         # First check if user exists, regardless of active status
         query = "SELECT * FROM utilisateur WHERE email = ?"
-        result = db_manager.execute_query(query, (login_data.email,))
+        result = await async_db_manager.execute_query(query, (login_data.email,))
         
         if not result:
             raise HTTPException(status_code=401, detail="Aucun compte trouvé avec cet email")
@@ -134,7 +153,7 @@ def login_user(login_data: LoginRequest):
         if user.get('actif') != 1:
             # If user exists but is inactive, activate them
             activate_query = "UPDATE utilisateur SET actif = 1 WHERE id_utilisateur = ?"
-            db_manager.execute_query(activate_query, (user['id_utilisateur'],))
+            await async_db_manager.execute_query(activate_query, (user['id_utilisateur'],))
             
         # Verify password
         if not verify_password(login_data.password, user['mot_de_passe']):
@@ -142,7 +161,7 @@ def login_user(login_data: LoginRequest):
         
         # Update last login
         update_query = "UPDATE utilisateur SET derniere_connexion = CURRENT_TIMESTAMP WHERE id_utilisateur = ?"
-        db_manager.execute_query(update_query, (user['id_utilisateur'],))
+        await async_db_manager.execute_query(update_query, (user['id_utilisateur'],))
         
         return User(id=user['id_utilisateur'], name=user['nom'], email=user['email'], role=user['role'])
     except HTTPException:
@@ -152,15 +171,15 @@ def login_user(login_data: LoginRequest):
         raise HTTPException(status_code=500, detail="Erreur lors de la connexion")
 
 @app.get("/users", response_model=List[User])
-def get_users():
+async def get_users():
     query = "SELECT * FROM utilisateur WHERE actif = 1"
-    result = db_manager.execute_query(query)
+    result = await async_db_manager.execute_query(query)
     return [User(id=row['id_utilisateur'], name=row['nom'], email=row['email'], role=row['role']) for row in result]
 
 @app.get("/users/{user_id}", response_model=User)
-def get_user(user_id: int):
+async def get_user(user_id: int):
     query = "SELECT * FROM utilisateur WHERE id_utilisateur = ? AND actif = 1"
-    result = db_manager.execute_query(query, (user_id,))
+    result = await async_db_manager.execute_query(query, (user_id,))
     if result:
         row = result[0]
         return User(id=row['id_utilisateur'], name=row['nom'], email=row['email'], role=row['role'])
@@ -168,12 +187,12 @@ def get_user(user_id: int):
         raise HTTPException(status_code=404, detail="User not found")
 
 @app.put("/users/{user_id}", response_model=User)
-def update_user(user_id: int, user: User):
+async def update_user(user_id: int, user: User):
     query = "UPDATE utilisateur SET nom = ?, email = ?, role = ? WHERE id_utilisateur = ?"
-    db_manager.execute_query(query, (user.name, user.email, user.role, user_id))
+    await async_db_manager.execute_query(query, (user.name, user.email, user.role, user_id))
     # Fetch updated user
     get_query = "SELECT * FROM utilisateur WHERE id_utilisateur = ?"
-    result = db_manager.execute_query(get_query, (user_id,))
+    result = await async_db_manager.execute_query(get_query, (user_id,))
     if result:
         row = result[0]
         return User(id=row['id_utilisateur'], name=row['nom'], email=row['email'], role=row['role'])
@@ -181,21 +200,21 @@ def update_user(user_id: int, user: User):
         raise HTTPException(status_code=404, detail="User not found")
 
 @app.delete("/users/{user_id}")
-def delete_user(user_id: int):
+async def delete_user(user_id: int):
     query = "UPDATE utilisateur SET actif = 0 WHERE id_utilisateur = ?"
-    db_manager.execute_query(query, (user_id,))
+    await async_db_manager.execute_query(query, (user_id,))
     return {"message": "User deleted"}
 
 # --- Module CRUD ---
 @app.post("/modules", response_model=Module)
-def create_module(module: Module):
+async def create_module(module: Module):
     query = """
         INSERT INTO module (titre, type, description, contenu, id_enseignant, categorie, niveau, duree, objectifs)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
     """
-    db_manager.execute_query(query, (module.titre, module.type, module.description, module.contenu, module.id_enseignant, json.dumps(module.categorie), module.niveau, module.duree, json.dumps(module.objectifs)))
+    await async_db_manager.execute_query(query, (module.titre, module.type, module.description, module.contenu, module.id_enseignant, json.dumps(module.categorie), module.niveau, module.duree, json.dumps(module.objectifs)))
     get_query = "SELECT * FROM module WHERE titre = ? AND id_enseignant = ? ORDER BY id_module DESC LIMIT 1"
-    result = db_manager.execute_query(get_query, (module.titre, module.id_enseignant))
+    result = await async_db_manager.execute_query(get_query, (module.titre, module.id_enseignant))
     if result:
         row = result[0]
         return Module(id=row['id_module'], titre=row['titre'], type=row['type'], description=row['description'], contenu=row['contenu'], id_enseignant=row['id_enseignant'], categorie=json.loads(row['categorie']), niveau=row['niveau'], duree=row['duree'], objectifs=json.loads(row['objectifs']))
@@ -242,14 +261,14 @@ def parse_module_row(row):
     )
 
 @app.get("/modules", response_model=List[dict])
-def get_modules():
+async def get_modules():
     query = """
     SELECT m.*, u.nom as enseignant_nom
     FROM module m
     LEFT JOIN utilisateur u ON m.id_enseignant = u.id_utilisateur
     WHERE m.actif = 1
     """
-    result = db_manager.execute_query(query)
+    result = await async_db_manager.execute_query(query)
     modules = []
     for row in result:
         module = parse_module_row(row)
@@ -259,20 +278,20 @@ def get_modules():
     return modules
 
 @app.get("/modules/{module_id}", response_model=Module)
-def get_module(module_id: int):
+async def get_module(module_id: int):
     query = "SELECT * FROM module WHERE id_module = ? AND actif = 1"
-    result = db_manager.execute_query(query, (module_id,))
+    result = await async_db_manager.execute_query(query, (module_id,))
     if result:
         return parse_module_row(result[0])
     else:
         raise HTTPException(status_code=404, detail="Module not found")
 
 @app.put("/modules/{module_id}", response_model=Module)
-def update_module(module_id: int, module: Module):
+async def update_module(module_id: int, module: Module):
     query = "UPDATE module SET titre = ?, type = ?, description = ?, contenu = ?, id_enseignant = ?, categorie = ?, niveau = ?, duree = ?, objectifs = ? WHERE id_module = ?"
-    db_manager.execute_query(query, (module.titre, module.type, module.description, module.contenu, module.id_enseignant, json.dumps(module.categorie), module.niveau, module.duree, json.dumps(module.objectifs), module_id))
+    await async_db_manager.execute_query(query, (module.titre, module.type, module.description, module.contenu, module.id_enseignant, json.dumps(module.categorie), module.niveau, module.duree, json.dumps(module.objectifs), module_id))
     get_query = "SELECT * FROM module WHERE id_module = ?"
-    result = db_manager.execute_query(get_query, (module_id,))
+    result = await async_db_manager.execute_query(get_query, (module_id,))
     if result:
         row = result[0]
         return Module(id=row['id_module'], titre=row['titre'], type=row['type'], description=row['description'], contenu=row['contenu'], id_enseignant=row['id_enseignant'], categorie=json.loads(row['categorie']), niveau=row['niveau'], duree=row['duree'], objectifs=json.loads(row['objectifs']))
@@ -280,21 +299,28 @@ def update_module(module_id: int, module: Module):
         raise HTTPException(status_code=404, detail="Module not found")
 
 @app.delete("/modules/{module_id}")
-def delete_module(module_id: int):
+async def delete_module(module_id: int):
     query = "UPDATE module SET actif = 0 WHERE id_module = ?"
-    db_manager.execute_query(query, (module_id,))
+    await async_db_manager.execute_query(query, (module_id,))
     return {"message": "Module deleted"}
 
 # --- Lesson CRUD ---
 @app.post("/lessons", response_model=Lesson)
-def create_lesson(lesson: Lesson):
+async def create_lesson(lesson: Lesson):
     query = """
         INSERT INTO lecon (titre, description, duree, niveau, contenu, id_module, id_enseignant, ordre)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?)
     """
-    db_manager.execute_query(query, (lesson.titre, lesson.description, lesson.duree, lesson.niveau, lesson.contenu, lesson.id_module, lesson.id_enseignant, lesson.ordre))
-    get_query = "SELECT * FROM lecon WHERE titre = ? AND id_module = ? AND id_enseignant = ? ORDER BY id_lecon DESC LIMIT 1"
-    result = db_manager.execute_query(get_query, (lesson.titre, lesson.id_module, lesson.id_enseignant))
+
+    def insert_lesson(connection):
+        cursor = connection.execute(query, (lesson.titre, lesson.description, lesson.duree, lesson.niveau, lesson.contenu, lesson.id_module, lesson.id_enseignant, lesson.ordre))
+        # Blocs de contenu normalisés dans la même transaction
+        save_lesson_blocks(connection, cursor.lastrowid, lesson.contenu)
+        return cursor.lastrowid
+
+    lesson_id = await async_db_manager.run_in_transaction(insert_lesson)
+    get_query = "SELECT * FROM lecon WHERE id_lecon = ?"
+    result = await async_db_manager.execute_query(get_query, (lesson_id,))
     if result:
         row = result[0]
         return Lesson(id=row['id_lecon'], titre=row['titre'], description=row['description'], duree=row['duree'], niveau=row['niveau'], contenu=row['contenu'], id_module=row['id_module'], id_enseignant=row['id_enseignant'], ordre=row['ordre'])
@@ -302,15 +328,15 @@ def create_lesson(lesson: Lesson):
         raise HTTPException(status_code=500, detail="Lesson creation failed")
 
 @app.get("/lessons", response_model=List[Lesson])
-def get_lessons():
+async def get_lessons():
     query = "SELECT * FROM lecon WHERE actif = 1"
-    result = db_manager.execute_query(query)
+    result = await async_db_manager.execute_query(query)
     return [Lesson(id=row['id_lecon'], titre=row['titre'], description=row['description'], duree=row['duree'], niveau=row['niveau'], contenu=row['contenu'], id_module=row['id_module'], id_enseignant=row['id_enseignant'], ordre=row['ordre']) for row in result]
 
 @app.get("/lessons/{lesson_id}", response_model=Lesson)
-def get_lesson(lesson_id: int):
+async def get_lesson(lesson_id: int):
     query = "SELECT * FROM lecon WHERE id_lecon = ? AND actif = 1"
-    result = db_manager.execute_query(query, (lesson_id,))
+    result = await async_db_manager.execute_query(query, (lesson_id,))
     if result:
         row = result[0]
         return Lesson(id=row['id_lecon'], titre=row['titre'], description=row['description'], duree=row['duree'], niveau=row['niveau'], contenu=row['contenu'], id_module=row['id_module'], id_enseignant=row['id_enseignant'], ordre=row['ordre'])
@@ -318,11 +344,22 @@ def get_lesson(lesson_id: int):
         raise HTTPException(status_code=404, detail="Lesson not found")
 
 @app.put("/lessons/{lesson_id}", response_model=Lesson)
-def update_lesson(lesson_id: int, lesson: Lesson):
+async def update_lesson(lesson_id: int, lesson: Lesson):
     query = "UPDATE lecon SET titre = ?, description = ?, duree = ?, niveau = ?, contenu = ?, id_module = ?, id_enseignant = ?, ordre = ? WHERE id_lecon = ?"
-    db_manager.execute_query(query, (lesson.titre, lesson.description, lesson.duree, lesson.niveau, lesson.contenu, lesson.id_module, lesson.id_enseignant, lesson.ordre, lesson_id))
+
+    def update(connection):
+        before = connection.execute("SELECT id_module, has_video FROM lecon WHERE id_lecon = ?", (lesson_id,)).fetchone()
+        cursor = connection.execute(query, (lesson.titre, lesson.description, lesson.duree, lesson.niveau, lesson.contenu, lesson.id_module, lesson.id_enseignant, lesson.ordre, lesson_id))
+        if cursor.rowcount:
+            save_lesson_blocks(connection, lesson_id, lesson.contenu)
+            after = connection.execute("SELECT id_module, has_video FROM lecon WHERE id_lecon = ?", (lesson_id,)).fetchone()
+            if tuple(after) != tuple(before):
+                # La leçon change de module ou gagne/perd sa vidéo : progression des modules concernés recalculée
+                rebuild_module_progress(connection, [before['id_module'], after['id_module']])
+
+    await async_db_manager.run_in_transaction(update)
     get_query = "SELECT * FROM lecon WHERE id_lecon = ?"
-    result = db_manager.execute_query(get_query, (lesson_id,))
+    result = await async_db_manager.execute_query(get_query, (lesson_id,))
     if result:
         row = result[0]
         return Lesson(id=row['id_lecon'], titre=row['titre'], description=row['description'], duree=row['duree'], niveau=row['niveau'], contenu=row['contenu'], id_module=row['id_module'], id_enseignant=row['id_enseignant'], ordre=row['ordre'])
@@ -330,15 +367,15 @@ def update_lesson(lesson_id: int, lesson: Lesson):
         raise HTTPException(status_code=404, detail="Lesson not found")
 
 @app.delete("/lessons/{lesson_id}")
-def delete_lesson(lesson_id: int):
+async def delete_lesson(lesson_id: int):
     query = "UPDATE lecon SET actif = 0 WHERE id_lecon = ?"
-    db_manager.execute_query(query, (lesson_id,))
+    await async_db_manager.execute_query(query, (lesson_id,))
     return {"message": "Lesson deleted"}
 
 @app.get("/lessons/module/{module_id}", response_model=List[Lesson])
-def get_lessons_by_module(module_id: int):
+async def get_lessons_by_module(module_id: int):
     query = "SELECT * FROM lecon WHERE id_module = ? AND actif = 1"
-    result = db_manager.execute_query(query, (module_id,))
+    result = await async_db_manager.execute_query(query, (module_id,))
     return [Lesson(
         id=row['id_lecon'],
         titre=row['titre'],
@@ -353,17 +390,17 @@ def get_lessons_by_module(module_id: int):
 
 # --- Exercise CRUD ---
 @app.post("/exercises", response_model=Exercise)
-def create_exercise(exercise: Exercise):
+async def create_exercise(exercise: Exercise):
     query = """
         INSERT INTO exercice (question, solution, feedback, points, id_module, id_lecon, id_enseignant, tp)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?)
     """
-    db_manager.execute_query(query, (
+    await async_db_manager.execute_query(query, (
         exercise.question, exercise.solution, exercise.feedback, exercise.points,
         exercise.id_module, exercise.id_lecon, exercise.id_enseignant, exercise.tp
     ))
     get_query = "SELECT * FROM exercice WHERE question = ? AND id_enseignant = ? ORDER BY id_exercice DESC LIMIT 1"
-    result = db_manager.execute_query(get_query, (exercise.question, exercise.id_enseignant))
+    result = await async_db_manager.execute_query(get_query, (exercise.question, exercise.id_enseignant))
     if result:
         row = result[0]
         return Exercise(
@@ -376,9 +413,9 @@ def create_exercise(exercise: Exercise):
         raise HTTPException(status_code=500, detail="Exercise creation failed")
 
 @app.get("/exercises", response_model=List[Exercise])
-def get_exercises():
+async def get_exercises():
     query = "SELECT * FROM exercice WHERE actif = 1"
-    result = db_manager.execute_query(query)
+    result = await async_db_manager.execute_query(query)
     return [Exercise(
         id=row['id_exercice'], question=row['question'], solution=row['solution'],
         feedback=row['feedback'], points=row['points'],
@@ -387,7 +424,7 @@ def get_exercises():
     ) for row in result]
 
 @app.get("/exercises/filter", response_model=List[Exercise])
-def get_exercises_by_chapter_tp(chapter: str = None, tp: str = None):
+async def get_exercises_by_chapter_tp(chapter: str = None, tp: str = None):
     query = "SELECT * FROM exercice WHERE actif = 1"
     params = []
     if chapter:
@@ -396,7 +433,7 @@ def get_exercises_by_chapter_tp(chapter: str = None, tp: str = None):
     if tp:
         query += " AND tp = ?"
         params.append(tp)
-    result = db_manager.execute_query(query, tuple(params))
+    result = await async_db_manager.execute_query(query, tuple(params))
     return [Exercise(
         id=row['id_exercice'], question=row['question'], solution=row['solution'],
         feedback=row['feedback'], points=row['points'],
@@ -405,9 +442,9 @@ def get_exercises_by_chapter_tp(chapter: str = None, tp: str = None):
     ) for row in result]
 
 @app.get("/exercises/{exercise_id}", response_model=Exercise)
-def get_exercise(exercise_id: int):
+async def get_exercise(exercise_id: int):
     query = "SELECT * FROM exercice WHERE id_exercice = ? AND actif = 1"
-    result = db_manager.execute_query(query, (exercise_id,))
+    result = await async_db_manager.execute_query(query, (exercise_id,))
     if result:
         row = result[0]
         return Exercise(
@@ -420,14 +457,14 @@ def get_exercise(exercise_id: int):
         raise HTTPException(status_code=404, detail="Exercise not found")
 
 @app.put("/exercises/{exercise_id}", response_model=Exercise)
-def update_exercise(exercise_id: int, exercise: Exercise):
+async def update_exercise(exercise_id: int, exercise: Exercise):
     query = "UPDATE exercice SET question = ?, solution = ?, feedback = ?, points = ?, id_module = ?, id_lecon = ?, id_enseignant = ?, tp = ? WHERE id_exercice = ?"
-    db_manager.execute_query(query, (
+    await async_db_manager.execute_query(query, (
         exercise.question, exercise.solution, exercise.feedback, exercise.points,
         exercise.id_module, exercise.id_lecon, exercise.id_enseignant, exercise.tp, exercise_id
     ))
     get_query = "SELECT * FROM exercice WHERE id_exercice = ?"
-    result = db_manager.execute_query(get_query, (exercise_id,))
+    result = await async_db_manager.execute_query(get_query, (exercise_id,))
     if result:
         row = result[0]
         return Exercise(
@@ -440,15 +477,15 @@ def update_exercise(exercise_id: int, exercise: Exercise):
         raise HTTPException(status_code=404, detail="Exercise not found")
 
 @app.delete("/exercises/{exercise_id}")
-def delete_exercise(exercise_id: int):
+async def delete_exercise(exercise_id: int):
     query = "UPDATE exercice SET actif = 0 WHERE id_exercice = ?"
-    db_manager.execute_query(query, (exercise_id,))
+    await async_db_manager.execute_query(query, (exercise_id,))
     return {"message": "Exercise deleted"}
 
 @app.get("/exercises/lesson/{lesson_id}", response_model=List[Exercise])
-def get_exercises_by_lesson(lesson_id: int):
+async def get_exercises_by_lesson(lesson_id: int):
     query = "SELECT * FROM exercice WHERE id_lecon = ? AND actif = 1"
-    result = db_manager.execute_query(query, (lesson_id,))
+    result = await async_db_manager.execute_query(query, (lesson_id,))
     return [Exercise(
         id=row['id_exercice'], question=row['question'], solution=row['solution'],
         feedback=row['feedback'], points=row['points'],
@@ -458,71 +495,76 @@ def get_exercises_by_lesson(lesson_id: int):
 
 # --- Quiz CRUD ---
 @app.post("/quizzes", response_model=Quiz)
-def create_quiz(quiz: Quiz):
+async def create_quiz(quiz: Quiz):
     query = """
         INSERT INTO quiz (titre, id_module)
         VALUES (?, ?)
     """
-    db_manager.execute_query(query, (quiz.titre, quiz.id_module))
+    await async_db_manager.execute_query(query, (quiz.titre, quiz.id_module))
     get_query = "SELECT * FROM quiz WHERE titre = ? AND id_module = ? ORDER BY id_quiz DESC LIMIT 1"
-    result = db_manager.execute_query(get_query, (quiz.titre, quiz.id_module))
+    result = await async_db_manager.execute_query(get_query, (quiz.titre, quiz.id_module))
     if not result:
         raise HTTPException(status_code=500, detail="Quiz creation failed")
     quiz_id = result[0]['id_quiz']
     # Insert questions
     for q in quiz.questions:
-        db_manager.execute_query(
+        await async_db_manager.execute_query(
             "INSERT INTO quiz_question (id_quiz, enonce, choix, bonnes_reponses) VALUES (?, ?, ?, ?)",
             (quiz_id, q.enonce, json.dumps(q.choix), json.dumps(q.bonnes_reponses))
         )
     # Return full quiz with questions
-    return get_quiz(quiz_id)
-
-@app.get("/quizzes", response_model=List[Quiz])
-def get_quizzes():
-    query = "SELECT * FROM quiz WHERE actif = 1"
-    result = db_manager.execute_query(query)
-    quizzes = []
-    for row in result:
-        quiz_id = row['id_quiz']
-        questions = db_manager.execute_query("SELECT * FROM quiz_question WHERE id_quiz = ?", (quiz_id,))
-        questions = [QuizQuestion(id=q['id_question'], enonce=q['enonce'], choix=json.loads(q['choix']), bonnes_reponses=json.loads(q['bonnes_reponses'])) for q in questions]
-        quizzes.append(Quiz(id=row['id_quiz'], titre=row['titre'], id_module=row['id_module'], questions=questions))
+    return await get_quiz(quiz_id)
+
+# Quiz complets validés par Quiz ; avec `fields`, seuls les champs projetés sont renvoyés
+@app.get("/quizzes", response_model=Union[List[Quiz], List[QuizProjection]], response_model_exclude_unset=True)
+async def get_quizzes(
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    fields: Optional[str] = None,
+):
+    """
+    Active quizzes with their questions, paginated with limit/offset.
+    `fields` (e.g. "id,titre") projects each quiz; questions are not loaded
+    unless requested.
+    """
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    quizzes = await quiz_repository.list_active(limit, offset, selected)
+    if selected is None:
+        return [Quiz(**quiz) for quiz in quizzes]
     return quizzes
 
 @app.get("/quizzes/{quiz_id}", response_model=Quiz)
-def get_quiz(quiz_id: int):
-    query = "SELECT * FROM quiz WHERE id_quiz = ? AND actif = 1"
-    result = db_manager.execute_query(query, (quiz_id,))
-    if not result:
+async def get_quiz(quiz_id: int):
+    quiz = await quiz_repository.get(quiz_id)
+    if quiz is None:
         raise HTTPException(status_code=404, detail="Quiz not found")
-    row = result[0]
-    questions = db_manager.execute_query("SELECT * FROM quiz_question WHERE id_quiz = ?", (quiz_id,))
-    questions = [QuizQuestion(id=q['id_question'], enonce=q['enonce'], choix=json.loads(q['choix']), bonnes_reponses=json.loads(q['bonnes_reponses'])) for q in questions]
-    return Quiz(id=row['id_quiz'], titre=row['titre'], id_module=row['id_module'], questions=questions)
+    return quiz
 
 @app.delete("/quizzes/{quiz_id}")
-def delete_quiz(quiz_id: int):
-    db_manager.execute_query("UPDATE quiz SET actif = 0 WHERE id_quiz = ?", (quiz_id,))
+async def delete_quiz(quiz_id: int):
+    await async_db_manager.execute_query("UPDATE quiz SET actif = 0 WHERE id_quiz = ?", (quiz_id,))
     return {"message": "Quiz deleted"}
 
 @app.get("/quizzes/module/{id_module}", response_model=List[Quiz])
-def get_quizzes_by_module(id_module: int):
+async def get_quizzes_by_module(id_module: int):
     query = "SELECT * FROM quiz WHERE id_module = ?"
-    result = db_manager.execute_query(query, (id_module,))
+    result = await async_db_manager.execute_query(query, (id_module,))
     return [Quiz(**row) for row in result]
 
 @app.post("/quizzes/submit", response_model=QuizAttemptResponse)
-def submit_quiz_attempt(attempt: QuizAttemptRequest):
+async def submit_quiz_attempt(attempt: QuizAttemptRequest):
     # Get the quiz with all questions
     quiz_query = "SELECT * FROM quiz WHERE id_quiz = ?"
-    quiz_result = db_manager.execute_query(quiz_query, (attempt.quiz_id,))
+    quiz_result = await async_db_manager.execute_query(quiz_query, (attempt.quiz_id,))
     if not quiz_result:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
     # Get all questions for this quiz
     questions_query = "SELECT * FROM quiz_question WHERE id_quiz = ?"
-    questions_result = db_manager.execute_query(questions_query, (attempt.quiz_id,))
+    questions_result = await async_db_manager.execute_query(questions_query, (attempt.quiz_id,))
     questions = [{
         'id': q['id_question'],
         'correct_answers': json.loads(q['bonnes_reponses']),
@@ -550,10 +592,12 @@ def submit_quiz_attempt(attempt: QuizAttemptRequest):
             INSERT INTO score_quiz (id_utilisateur, id_quiz, score, passed)
             VALUES (?, ?, ?, ?)
         """
-        db_manager.execute_query(
-            insert_query,
-            (attempt.user_id, attempt.quiz_id, score, passed)
-        )
+
+        def record_score(connection):
+            connection.execute(insert_query, (attempt.user_id, attempt.quiz_id, score, passed))
+            apply_quiz_score(connection, attempt.user_id, attempt.quiz_id, score)
+
+        await async_db_manager.run_in_transaction(record_score)
     
     # Check if we should show remedial questions
     show_remedial = False
@@ -574,7 +618,7 @@ def submit_quiz_attempt(attempt: QuizAttemptRequest):
     )
 
 @app.get("/quizzes/user/{user_id}/module/{module_id}", response_model=List[dict])
-def get_user_quiz_progress(user_id: int, module_id: int):
+async def get_user_quiz_progress(user_id: int, module_id: int):
     """
     Get user's quiz progress for a specific module.
     Returns a list of quizzes with their completion status and scores.
@@ -587,7 +631,7 @@ def get_user_quiz_progress(user_id: int, module_id: int):
         WHERE q.id_module = ?
         ORDER BY q.id_quiz
     """
-    result = db_manager.execute_query(quizzes_query, (user_id, module_id))
+    result = await async_db_manager.execute_query(quizzes_query, (user_id, module_id))
     
     # Format the response
     quizzes = []
@@ -605,7 +649,7 @@ def get_user_quiz_progress(user_id: int, module_id: int):
 
 # --- Video Progress Tracking ---
 @app.post("/progress/video")
-def track_video_progress(progress_data: dict):
+async def track_video_progress(progress_data: dict):
     """
     Track video watching progress for a user.
     Expected data: user_id, lesson_id, progress_percentage (0-100)
@@ -618,36 +662,16 @@ def track_video_progress(progress_data: dict):
         if not all([user_id, lesson_id, progress_percentage is not None]):
             raise HTTPException(status_code=400, detail="Missing required fields: user_id, lesson_id, progress_percentage")
         
-        # Check if progress entry already exists
-        check_query = """
-            SELECT * FROM progression_etudiant
-            WHERE id_etudiant = ? AND id_lecon = ?
-        """
-        existing = db_manager.execute_query(check_query, (user_id, lesson_id))
-        
-        if existing:
-            # Update existing progress
-            update_query = """
-                UPDATE progression_etudiant
-                SET score = ?, temps_passe = ?
-                WHERE id_etudiant = ? AND id_lecon = ?
-            """
-            db_manager.execute_query(update_query, (progress_percentage, 0, user_id, lesson_id))
-        else:
-            # Create new progress entry
-            insert_query = """
-                INSERT INTO progression_etudiant
-                (id_etudiant, id_lecon, statut, score, temps_passe)
-                VALUES (?, ?, 'en_cours', ?, 0)
-            """
-            db_manager.execute_query(insert_query, (user_id, lesson_id, progress_percentage))
-        
+        # Valeur gardée en mémoire (dernière et maximum par étudiant/leçon), écrite par lots
+        if progress_buffer.record(user_id, lesson_id, progress_percentage):
+            await progress_buffer.flush()
+
         return {"message": "Video progress tracked successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error tracking video progress: {str(e)}")
 
 @app.get("/progress/module/{user_id}/{module_id}")
-def get_module_progress(user_id: int, module_id: int):
+async def get_module_progress(user_id: int, module_id: int):
     """
     Calculate overall module progress based on video watching (70%) and quiz scores (30%).
     Progress is calculated as:
@@ -655,104 +679,95 @@ def get_module_progress(user_id: int, module_id: int):
     - 30%: Average quiz scores for the module
     """
     try:
-        # Get total number of videos in the module
-        total_videos_query = """
-            SELECT COUNT(*) as total_videos
-            FROM lecon 
-            WHERE id_module = ? 
-            AND (contenu LIKE '%"type":"video"%' OR contenu LIKE '%"type":"video_manim"%')
-        """
-        total_videos_result = db_manager.execute_query(total_videos_query, (module_id,))
-        total_videos = total_videos_result[0]['total_videos'] if total_videos_result else 0
-        
-        # Get user's video progress
-        video_progress_query = """
-            SELECT l.id_lecon, pe.score
-            FROM lecon l
-            LEFT JOIN progression_etudiant pe ON l.id_lecon = pe.id_lecon AND pe.id_etudiant = ?
-            WHERE l.id_module = ? 
-            AND (l.contenu LIKE '%"type":"video"%' OR l.contenu LIKE '%"type":"video_manim"%')
-        """
-        video_progress_result = db_manager.execute_query(video_progress_query, (user_id, module_id))
-        
-        # Calculate average progress and count watched videos
-        total_progress = 0
-        watched_videos = 0
-        video_count = 0
-        
-        for row in video_progress_result:
-            video_count += 1
-            progress = row['score'] or 0
-            total_progress += progress
-            if progress >= 90:  # Consider video as watched if progress >= 90%
-                watched_videos += 1
-        
-        avg_video_progress = (total_progress / video_count) if video_count > 0 else 0
-        
-        # Get total number of quizzes in the module
-        quizzes_query = """
-            SELECT COUNT(*) as total_quizzes
-            FROM quiz q
-            WHERE q.id_module = ?
-        """
-        quizzes_result = db_manager.execute_query(quizzes_query, (module_id,))
-        total_quizzes = quizzes_result[0]['total_quizzes'] if quizzes_result else 0
-        
-        # Get user's quiz scores for this module
-        quiz_scores_query = """
-            SELECT AVG(sq.score) as avg_score
-            FROM score_quiz sq
-            JOIN quiz q ON sq.id_quiz = q.id_quiz
-            WHERE sq.id_utilisateur = ? AND q.id_module = ?
-        """
-        quiz_scores_result = db_manager.execute_query(quiz_scores_query, (user_id, module_id))
-        avg_quiz_score = quiz_scores_result[0]['avg_score'] if quiz_scores_result and quiz_scores_result[0]['avg_score'] else 0
-        
-        # Calculate overall progress (70% videos + 30% quizzes)
-        overall_progress = (avg_video_progress * 0.7) + (avg_quiz_score * 0.3)
-        
-        return {
-            "overall_progress": overall_progress,
-            "video_progress": avg_video_progress,
-            "quiz_score": avg_quiz_score,
-            "total_videos": total_videos,
-            "watched_videos": watched_videos,
-            "total_quizzes": total_quizzes
-        }
+        # Sommes matérialisées dans module_progress, plus la progression vidéo pas encore écrite
+        row = await async_db_manager.read_snapshot(
+            read_module_progress, user_id, module_id, progress_buffer.pending(user_id)
+        )
+        return summarize_module_progress(row)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error calculating module progress: {str(e)}")
 
 class PlotRequest(BaseModel):
     code: str
+    # "auto" : SVG pour les tracés légers, PNG pour les tracés denses ou les images
+    format: Literal["png", "svg", "webp", "auto"] = "png"
+    dpi: Optional[int] = Field(None, ge=10, le=600)
+    width: Optional[int] = Field(None, ge=16, le=8000)  # pixels
+    height: Optional[int] = Field(None, ge=16, le=8000)
+    rasterize_threshold: int = Field(RASTERIZE_THRESHOLD, ge=0)
+    # "data" : séries enregistrées en JSON, tracées par le frontend (pas de rendu serveur)
+    mode: Literal["image", "data"] = "image"
+    max_points: int = Field(DATA_MAX_POINTS, ge=10, le=100_000)  # par série, au-delà : sous-échantillonnage LTTB
+    encoding: Literal["json", "base64"] = "json"
+
+# Les images sont adressées par contenu : une clé ne change jamais de contenu
+PLOT_CACHE_HEADERS = {"Cache-Control": "public, max-age=31536000, immutable"}
+
+def plot_response(key, media_type, content, path, **headers):
+    headers = {"ETag": f'"{key}"', **PLOT_CACHE_HEADERS, **headers}
+    if path is not None:
+        # Grande image : envoyée en flux depuis le cache disque
+        return FileResponse(path, media_type=media_type, headers=headers)
+    return Response(content=content, media_type=media_type, headers=headers)
 
 @app.post("/plot")
-def plot_python_code(request: PlotRequest):
-    # Redirect stdout/stderr to capture errors
-    old_stdout = sys.stdout
-    old_stderr = sys.stderr
-    sys.stdout = io.StringIO()
-    sys.stderr = io.StringIO()
-    try:
-        # Prepare a restricted namespace
-        allowed_builtins = {'__builtins__': {}}
-        safe_globals = {
-            "plt": plt,
-            "np": np,
-        }
-        # Execute the code
-        exec(request.code, {**allowed_builtins, **safe_globals})
-        # Save the plot to a buffer
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png')
-        plt.close()
-        buf.seek(0)
-        return Response(content=buf.read(), media_type="image/png")
-    except Exception as e:
-        error_output = sys.stdout.getvalue() + sys.stderr.getvalue() + str(e)
-        return Response(content=f"Error in code execution:\n{error_output}", media_type="text/plain", status_code=400)
-    finally:
-        sys.stdout = old_stdout
-        sys.stderr = old_stderr
+async def plot_python_code(request: PlotRequest):
+    """
+    Render the snippet to PNG, SVG or WebP, or with mode "data" return the
+    recorded series as JSON. Identical code and options are served from the
+    plot cache; the response's Content-Location (/plot/{key}) can be fetched
+    with GET and revalidated with If-None-Match.
+    """
+    data_options = {"mode", "max_points", "encoding"}
+    if request.mode == "data":
+        options = request.model_dump(include=data_options)
+    else:
+        options = request.model_dump(exclude={"code"} | data_options)
+    key = plot_cache_key(request.code, **options)
+    cached = plot_cache.get(key)
+    if cached is None and request.mode == "data":
+        media_type, content, error_output = await plot_executor.run(
+            record_plot, request.code, request.max_points, request.encoding,
+        )
+        if error_output is not None:
+            return Response(content=f"Error in code execution:\n{error_output}", media_type="text/plain", status_code=400)
+        plot_cache.put(key, media_type, content)
+        cached = (media_type, content, None)
+    if cached is None:
+        out_path = plot_cache.temp_path(key)
+        # Exécuté dans un worker de rendu (Figure propre à la requête, limites CPU/mémoire)
+        try:
+            media_type, content, error_output = await plot_executor.run(
+                render_plot, request.code, request.format, request.dpi, request.width,
+                request.height, request.rasterize_threshold, out_path=out_path,
+            )
+        except HTTPException:
+            # Worker interrompu (délai dépassé) : fichier partiel éventuel
+            plot_cache.discard_temp(out_path)
+            raise
+        if error_output is not None:
+            return Response(content=f"Error in code execution:\n{error_output}", media_type="text/plain", status_code=400)
+        if out_path is not None:
+            cached = plot_cache.put_file(key, media_type, out_path)
+        else:
+            plot_cache.put(key, media_type, content)
+            cached = (media_type, content, None)
+    return plot_response(key, *cached, **{"Content-Location": f"/plot/{key}"})
+
+@app.get("/plot/cache/stats")
+def plot_cache_stats():
+    return plot_cache.stats()
+
+@app.get("/plot/{key}")
+def get_cached_plot(key: str, request: Request):
+    if not re.fullmatch(r"[0-9a-f]{64}", key):
+        raise HTTPException(status_code=404, detail="Graphique introuvable dans le cache.")
+    if request.headers.get("if-none-match", "").strip() in (f'"{key}"', f'W/"{key}"', "*"):
+        return Response(status_code=304, headers={"ETag": f'"{key}"', **PLOT_CACHE_HEADERS})
+    cached = plot_cache.get(key)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Graphique introuvable dans le cache.")
+    return plot_response(key, *cached)
 
 # --- Mode Examen : chapitres et exercices démo ---
 @app.get("/chapters/")
@@ -814,7 +829,7 @@ def parse_equation(eq: str) -> Optional[dict]:
     return {"m": m, "b": b}
 
 @app.post("/api/solve-linear-system", response_model=LinearSystemResponse)
-def solve_linear_system(request: LinearSystemRequest):
+async def solve_linear_system(request: LinearSystemRequest):
     coeffs1 = parse_equation(request.eq1)
     coeffs2 = parse_equation(request.eq2)
 
@@ -840,7 +855,7 @@ def solve_linear_system(request: LinearSystemRequest):
     # Save to history if user_id is provided and solution is not invalid
     if request.user_id and response["solution_type"] != 'invalid':
         try:
-            db_manager.execute_query(
+            await async_db_manager.execute_query(
                 "INSERT INTO linear_system_history (id_utilisateur, equation1, equation2, solution_type, solution_x, solution_y) VALUES (?, ?, ?, ?, ?, ?)",
                 (
                     request.user_id,
@@ -858,18 +873,18 @@ def solve_linear_system(request: LinearSystemRequest):
 
 
 @app.get("/api/history/linear-system/{user_id}")
-def get_user_history(user_id: int):
+async def get_user_history(user_id: int):
     try:
-        history = db_manager.execute_query("SELECT * FROM linear_system_history WHERE id_utilisateur = ? ORDER BY timestamp DESC", (user_id,))
+        history = await async_db_manager.execute_query("SELECT * FROM linear_system_history WHERE id_utilisateur = ? ORDER BY timestamp DESC", (user_id,))
         return history
     except Exception as e:
         logger.error(f"Error fetching history for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch history")
 
 @app.delete("/api/history/linear-system/{user_id}")
-def delete_user_history(user_id: int):
+async def delete_user_history(user_id: int):
     try:
-        db_manager.execute_query("DELETE FROM linear_system_history WHERE id_utilisateur = ?", (user_id,))
+        await async_db_manager.execute_query("DELETE FROM linear_system_history WHERE id_utilisateur = ?", (user_id,))
         return {"message": "History cleared successfully"}
     except Exception as e:
         logger.error(f"Error deleting history for user {user_id}: {e}")
@@ -4,6 +4,7 @@ from pydantic import BaseModel
 import numpy as np
 from typing import List, Optional, Literal
 from services import gaussian_elimination, lu_decomposition
+from iterative_solvers import iterative_solve
 
 app = FastAPI()
 
@@ -88,49 +89,14 @@ def solve(req: MatrixRequest):
             solution, steps = gaussian_elimination(mat, b)
             return {"method": method, "steps": steps, "solution": solution}
         elif method == "lu":
-            L, U, steps = lu_decomposition(mat)
-            return {"method": method, "steps": steps, "L": L, "U": U}
-        elif method == "jacobi":
+            L, U, perm, steps = lu_decomposition(mat)
+            return {"method": method, "steps": steps, "L": L, "U": U, "perm": perm}
+        elif method in ("jacobi", "gauss-seidel"):
             if b is None:
                 raise HTTPException(status_code=400, detail="Le vecteur b est requis.")
-            # Jacobi iterative method
-            n = len(mat)
-            x = np.zeros(n)
-            steps = [f"Initial guess: {x.tolist()}"]
-            max_iter = 50
-            tol = 1e-8
-            for it in range(max_iter):
-                x_new = np.zeros(n)
-                for i in range(n):
-                    s = sum(mat[i][j] * x[j] for j in range(n) if j != i)
-                    x_new[i] = (b[i] - s) / mat[i][i]
-                err = np.linalg.norm(x_new - x, 2)
-                steps.append(f"Iter {it+1}: {x_new.tolist()} (err={err})")
-                if err < tol:
-                    break
-                x = x_new
-            return {"method": method, "steps": steps, "solution": x.tolist()}
-        elif method == "gauss-seidel":
-            if b is None:
-                raise HTTPException(status_code=400, detail="Le vecteur b est requis.")
-            # Gauss-Seidel iterative method
-            n = len(mat)
-            x = np.zeros(n)
-            steps = [f"Initial guess: {x.tolist()}"]
-            max_iter = 50
-            tol = 1e-8
-            for it in range(max_iter):
-                x_new = x.copy()
-                for i in range(n):
-                    s1 = sum(mat[i][j] * x_new[j] for j in range(i))
-                    s2 = sum(mat[i][j] * x[j] for j in range(i+1, n))
-                    x_new[i] = (b[i] - s1 - s2) / mat[i][i]
-                err = np.linalg.norm(x_new - x, 2)
-                steps.append(f"Iter {it+1}: {x_new.tolist()} (err={err})")
-                if err < tol:
-                    break
-                x = x_new
-            return {"method": method, "steps": steps, "solution": x.tolist()}
+            # Jacobi / Gauss-Seidel (balayages vectorisés)
+            solution, steps, _, _ = iterative_solve(method, mat, b)
+            return {"method": method, "steps": steps, "solution": solution}
         else:
             raise HTTPException(status_code=400, detail="Méthode non supportée.")
     except Exception as e:
@@ -1,262 +1,504 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional, Literal
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Optional, Literal, Tuple, Union
+import json
+import math
 import numpy as np
-from services import gaussian_elimination, lu_decomposition, lu_solve
+import scipy.sparse as sp
+from scipy.sparse.linalg import norm as sparse_norm, svds
+from services import gaussian_elimination, lu_solve
+from iterative_solvers import (
+    ITERATIVE_METHODS, MAX_ITER, TOL,
+    iterative_solve, convergence_errors, check_convergence, ensure_convergent, sweeps,
+)
+from result_cache import result_cache
+from factor_store import factor_store
+from batch_ops import run_batch
+from root_finding import (
+    DEFAULT_METHODS, MAX_ITER as ROOT_MAX_ITER, MAX_SAMPLES as ROOT_MAX_SAMPLES, TOL as ROOT_TOL,
+    convergence_traces, find_roots,
+)
+from compute_pool import compute_executor
+from binary_io import (
+    BINARY_MEDIA_TYPES, NPY_MEDIA_TYPE, SHAPE_HEADER,
+    media_type, decode_array, wants_npy, encode_npy,
+)
 
 router = APIRouter()
 
+# --- Matrices creuses ---
+class SparseMatrix(BaseModel):
+    # COO : (rows[k], cols[k]) -> values[k]
+    # CSR : rows = indptr (longueur shape[0] + 1), cols = indices
+    rows: List[int]
+    cols: List[int]
+    values: List[float]
+    shape: Tuple[int, int]
+    format: Literal["coo", "csr"] = "coo"
+
+def to_sparse(s: SparseMatrix):
+    if s.format == "csr":
+        A = sp.csr_matrix((s.values, s.cols, s.rows), shape=s.shape, dtype=float)
+        A.check_format(full_check=True)
+        return A
+    return sp.coo_matrix((s.values, (s.rows, s.cols)), shape=s.shape, dtype=float).tocsr()
+
+def load_matrix(matrix, sparse, keep_sparse=False):
+    """
+    Build the operand from either the dense `matrix` field or the `sparse` payload.
+    Sparse input stays in CSR form only where the operation supports it.
+    """
+    if sparse is not None:
+        A = to_sparse(sparse)
+        return A if keep_sparse else A.toarray()
+    if matrix is None:
+        raise ValueError("La matrice n'est pas fournie.")
+    return np.asarray(matrix)
+
 # --- Systèmes linéaires ---
 class LinearSystemRequest(BaseModel):
-    A: List[List[float]]
+    A: Optional[List[List[float]]] = None
+    A_sparse: Optional[SparseMatrix] = None
     b: List[float]
     x0: List[float]
+    tol: float = Field(TOL, gt=0)
+    max_iter: int = Field(MAX_ITER, ge=1, le=10000)
+    # Si omega est fourni, la courbe SOR est ajoutée à la réponse
+    omega: Optional[float] = Field(None, gt=0, lt=2)
+    # Diagnostic seulement : les courbes (y compris divergentes) sont toujours calculées
+    precheck: bool = False
+
+def convergence_curves(A, b, x0, max_iter, tol, omega, precheck):
+    curves = {"jacobi": "jacobi", "gaussSeidel": "gauss-seidel"}
+    if omega is not None:
+        curves["sor"] = "sor"
+    omega = omega if omega is not None else 1.0
+    result = {}
+    prechecks = {}
+    for key, method in curves.items():
+        if precheck:
+            prechecks[key] = check_convergence(method, A, omega)
+        result[key] = convergence_errors(method, A, b, x0, max_iter, tol, omega)
+    if precheck:
+        result["precheck"] = prechecks
+    return result
 
 @router.post("/api/linear_system/convergence")
-def linear_system_convergence(data: LinearSystemRequest):
-    import numpy as np
-    A = np.array(data.A, dtype=float)
+async def linear_system_convergence(data: LinearSystemRequest):
+    """
+    Error curves of Jacobi and Gauss-Seidel (and SOR when `omega` is given).
+    With `precheck`, the convergence test of each method is also reported
+    under "precheck"; a diverging method still gets its curve.
+    """
+    try:
+        A = load_matrix(data.A, data.A_sparse, keep_sparse=True)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
     b = np.array(data.b, dtype=float)
     x0 = np.array(data.x0, dtype=float)
-    n = len(b)
-    max_iter = 50
-    tol = 1e-8
-    errors_jacobi = []
-    errors_gs = []
-    # Jacobi
-    x_jac = x0.copy()
-    for _ in range(max_iter):
-        x_new = x_jac.copy()
-        for i in range(n):
-            s = sum(A[i, j] * x_jac[j] for j in range(n) if j != i)
-            x_new[i] = (b[i] - s) / A[i, i]
-        err = np.linalg.norm(x_new - x_jac, 2)
-        errors_jacobi.append(float(err))
-        if err < tol:
-            break
-        x_jac = x_new
-    # Gauss-Seidel
-    x_gs = x0.copy()
-    for _ in range(max_iter):
-        x_new = x_gs.copy()
-        for i in range(n):
-            s1 = sum(A[i, j] * x_new[j] for j in range(i))
-            s2 = sum(A[i, j] * x_gs[j] for j in range(i + 1, n))
-            x_new[i] = (b[i] - s1 - s2) / A[i, i]
-        err = np.linalg.norm(x_new - x_gs, 2)
-        errors_gs.append(float(err))
-        if err < tol:
-            break
-        x_gs = x_new
-    return {"jacobi": errors_jacobi, "gaussSeidel": errors_gs}
+    return await compute_executor.run(
+        convergence_curves, A, b, x0, data.max_iter, data.tol, data.omega, data.precheck
+    )
 
 # --- Équations non-linéaires ---
+NonLinearMethod = Literal["dichotomie", "newton", "pointFixe", "secante", "regulaFalsi", "brent", "halley"]
+
 class NonLinearRequest(BaseModel):
     fx: str
     x0: float
     gx: Optional[str] = None
-
-from fastapi import HTTPException
+    # Sous-ensemble des méthodes à calculer (par défaut : dichotomie, Newton, point fixe)
+    methods: List[NonLinearMethod] = Field(default_factory=lambda: list(DEFAULT_METHODS), min_length=1)
+    tol: float = Field(1e-10, gt=0)
+    max_iter: int = Field(30, ge=1, le=1000)
 
 @router.post("/api/nonlinear_equation/convergence")
-def nonlinear_convergence(data: NonLinearRequest):
-    import numpy as np
-    import math
-    from asteval import Interpreter
-    
-    aeval = Interpreter()
-    aeval.symtable['np'] = np
-    aeval.symtable['math'] = math
-
-    fx_str = data.fx.replace('^', '**').strip()
-    x0 = float(data.x0)
-    max_iter = 30
-    tol = 1e-10
-
-    def safe_eval(expr, x_val):
-        aeval.symtable['x'] = x_val
-        try:
-            return aeval.eval(expr)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Erreur d'évaluation: {e}")
-
-    # Newton
-    def df(expr, x, h=1e-6):
-        return (safe_eval(expr, x + h) - safe_eval(expr, x - h)) / (2 * h)
-
-    x_newton = x0
-    errors_newton = []
-    for _ in range(max_iter):
-        fval = safe_eval(fx_str, x_newton)
-        dfdx = df(fx_str, x_newton)
-        if abs(dfdx) < 1e-12:
-            break
-        x_next = x_newton - fval / dfdx
-        err = abs(x_next - x_newton)
-        errors_newton.append(float(err))
-        if err < tol:
-            break
-        x_newton = x_next
-
-    # Point fixe
-    errors_pf = []
-    x_pf = x0
-    gx_str = data.gx.strip() if data.gx else f"x - ({fx_str})"
-    
-    for _ in range(max_iter):
-        g = safe_eval(gx_str, x_pf)
-        if abs(g) > 1e6:
-            raise HTTPException(status_code=400, detail="La méthode du point fixe diverge.")
-        err = abs(g - x_pf)
-        errors_pf.append(float(err))
-        if err < tol:
-            break
-        x_pf = g
-
-    # Dichotomie
-    errors_dicho = []
-    a, b = x0 - 1, x0 + 1
-    fa, fb = safe_eval(fx_str, a), safe_eval(fx_str, b)
-
-    if fa * fb > 0:
-        raise HTTPException(status_code=400, detail="Pas de changement de signe trouvé pour la méthode de dichotomie dans l'intervalle [x0-1, x0+1].")
-
-    for _ in range(max_iter):
-        m = (a + b) / 2
-        fm = safe_eval(fx_str, m)
-        errors_dicho.append(abs(b - a))
-        if abs(fm) < tol or abs(b - a) < tol:
-            break
-        if fa * fm < 0:
-            b, fb = m, fm
-        else:
-            a, fa = m, fm
-    return {
-        "dichotomie": errors_dicho,
-        "newton": errors_newton,
-        "pointFixe": errors_pf
-    }
+async def nonlinear_convergence(data: NonLinearRequest):
+    """
+    Error trace of each requested method from x0, with the status of each
+    method under "status" (a diverging method keeps its partial trace).
+    Bracketing methods (dichotomie, regulaFalsi, brent) work on [x0-1, x0+1];
+    pointFixe iterates gx (x - fx by default).
+    """
+    try:
+        return await compute_executor.run(
+            convergence_traces, data.fx, data.x0, data.gx, tuple(data.methods), data.tol, data.max_iter
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# --- Recherche de toutes les racines sur un intervalle ---
+class RootSearchRequest(BaseModel):
+    fx: str
+    a: float
+    b: float
+    samples: int = Field(1000, ge=2, le=ROOT_MAX_SAMPLES)
+    method: Literal["brent", "dichotomie", "regulaFalsi", "newton"] = "brent"
+    tol: float = Field(ROOT_TOL, gt=0)
+    max_iter: int = Field(ROOT_MAX_ITER, ge=1, le=1000)
+
+@router.post("/api/nonlinear_equation/roots")
+async def nonlinear_roots(data: RootSearchRequest):
+    """
+    Every root of fx on [a, b]: fx is sampled on `samples` points (one
+    vectorized evaluation) to find the sign changes, then `method` refines
+    each bracket. Each root comes with its own error trace.
+    """
+    try:
+        return await compute_executor.run(
+            find_roots, data.fx, data.a, data.b, data.samples, data.method, data.tol, data.max_iter
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 class MatrixRequest(BaseModel):
-    matrix: List[List[float]]
+    matrix: Optional[List[List[float]]] = None
+    sparse: Optional[SparseMatrix] = None
     vector: Optional[List[float]] = None
-    method: Optional[Literal["gauss", "lu", "jacobi", "gauss-seidel"]] = None
+    method: Optional[Literal["gauss", "lu", "jacobi", "gauss-seidel", "sor", "ssor"]] = None
+    # Paramètres des méthodes itératives
+    tol: float = Field(TOL, gt=0)
+    max_iter: int = Field(MAX_ITER, ge=1, le=10000)
+    omega: float = Field(1.0, gt=0, lt=2)
+    precheck: bool = True
 
-@router.post("/matrix/determinant")
-def determinant(req: MatrixRequest):
+SOLVE_METHODS = ("gauss", "lu") + ITERATIVE_METHODS
+ITERATIVE_PARAMS = ("method", "tol", "max_iter", "omega", "precheck")
+
+async def read_matrix_request(request: Request) -> MatrixRequest:
+    """
+    Parse the body of a matrix endpoint: JSON (MatrixRequest) by default, or a
+    binary array (application/x-npy, or application/octet-stream with an
+    X-Matrix-Shape header) decoded without copying. For binary bodies `method`
+    and the iterative parameters come from the query string and, with
+    `augmented=true`, the last column is b.
+    """
+    body = await request.body()
+    ctype = media_type(request.headers.get("content-type"))
+    if ctype not in BINARY_MEDIA_TYPES:
+        try:
+            return MatrixRequest.model_validate_json(body)
+        except ValidationError as e:
+            errors = e.errors(include_url=False, include_context=False)
+            raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in errors])
     try:
-        mat = np.array(req.matrix)
-        det = float(np.linalg.det(mat))
+        arr = decode_array(body, ctype, request.headers.get(SHAPE_HEADER))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if arr.ndim != 2:
+        raise HTTPException(status_code=400, detail="La matrice doit être un tableau 2D.")
+    vector = None
+    if request.query_params.get("augmented", "").lower() in ("1", "true"):
+        arr, vector = arr[:, :-1], arr[:, -1]
+    params = {k: request.query_params[k] for k in ITERATIVE_PARAMS if k in request.query_params}
+    try:
+        parsed = MatrixRequest.model_validate(params)
+    except ValidationError as e:
+        errors = e.errors(include_url=False, include_context=False)
+        raise RequestValidationError([{**err, "loc": ("query", *err["loc"])} for err in errors])
+    return parsed.model_copy(update={"matrix": arr, "vector": vector})
+
+# Documentation OpenAPI du corps lu par read_matrix_request
+_matrix_schema = MatrixRequest.model_json_schema(ref_template="#/components/schemas/{model}")
+_matrix_schema.pop("$defs", None)
+MATRIX_BODY_DOC = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": _matrix_schema},
+            NPY_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+            "application/octet-stream": {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
+def array_result(request: Request, arr):
+    """Return `arr` as .npy when the client accepts it, JSON otherwise."""
+    if wants_npy(request.headers.get("accept")):
+        return Response(content=encode_npy(arr), media_type=NPY_MEDIA_TYPE)
+    return {"result": arr.tolist() if isinstance(arr, np.ndarray) else arr}
+
+# Calculs exécutés dans le pool de processus (fonctions de module, picklables)
+def compute_determinant(mat):
+    return float(np.linalg.det(mat))
+
+def compute_inverse(mat):
+    return np.linalg.inv(mat).tolist()
+
+def compute_product(mat, vec):
+    return mat @ vec
+
+@router.post("/matrix/determinant", openapi_extra=MATRIX_BODY_DOC)
+async def determinant(req: MatrixRequest = Depends(read_matrix_request)):
+    try:
+        mat = load_matrix(req.matrix, req.sparse)
+        det = await result_cache.cached_async(
+            lambda: compute_executor.run(compute_determinant, mat), "determinant", mat
+        )
         return {"result": det}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.post("/matrix/inverse")
-def inverse(req: MatrixRequest):
+@router.post("/matrix/inverse", openapi_extra=MATRIX_BODY_DOC)
+async def inverse(request: Request, req: MatrixRequest = Depends(read_matrix_request)):
     try:
-        mat = np.array(req.matrix)
-        inv = np.linalg.inv(mat)
-        return {"result": inv.tolist()}
+        mat = load_matrix(req.matrix, req.sparse)
+        inv = await result_cache.cached_async(
+            lambda: compute_executor.run(compute_inverse, mat), "inverse", mat
+        )
+        return array_result(request, inv)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.post("/matrix/transpose")
-def transpose(req: MatrixRequest):
+@router.post("/matrix/transpose", openapi_extra=MATRIX_BODY_DOC)
+def transpose(request: Request, req: MatrixRequest = Depends(read_matrix_request)):
+    # Vue sans calcul : pas d'intérêt à passer par le pool de processus
     try:
-        mat = np.array(req.matrix)
+        mat = load_matrix(req.matrix, req.sparse)
         t = mat.T
-        return {"result": t.tolist()}
+        return array_result(request, t)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.post("/matrix/norm")
-def norm(req: MatrixRequest, type: str = "fro"):
+def sparse_matrix_norm(mat, type):
+    if type == "2":
+        # Plus grande valeur singulière (ARPACK exige k < min(shape))
+        if min(mat.shape) <= 2:
+            return float(np.linalg.norm(mat.toarray(), 2))
+        return float(svds(mat, k=1, return_singular_vectors=False)[0])
+    if type == "1":
+        return float(sparse_norm(mat, 1))
+    if type == "inf":
+        return float(sparse_norm(mat, np.inf))
+    return float(sparse_norm(mat, "fro"))
+
+def matrix_norm(mat, type):
+    if sp.issparse(mat):
+        return sparse_matrix_norm(mat, type)
+    if type == "1":
+        return float(np.linalg.norm(mat, 1))
+    elif type == "2":
+        return float(np.linalg.norm(mat, 2))
+    elif type == "inf":
+        return float(np.linalg.norm(mat, np.inf))
+    else:
+        return float(np.linalg.norm(mat, "fro"))
+
+@router.post("/matrix/norm", openapi_extra=MATRIX_BODY_DOC)
+async def norm(type: str = "fro", req: MatrixRequest = Depends(read_matrix_request)):
     try:
-        mat = np.array(req.matrix)
-        if type == "1":
-            n = float(np.linalg.norm(mat, 1))
-        elif type == "2":
-            n = float(np.linalg.norm(mat, 2))
-        elif type == "inf":
-            n = float(np.linalg.norm(mat, np.inf))
-        else:
-            n = float(np.linalg.norm(mat, "fro"))
+        mat = load_matrix(req.matrix, req.sparse, keep_sparse=True)
+        n = await result_cache.cached_async(
+            lambda: compute_executor.run(matrix_norm, mat, type), "norm", mat, type=type
+        )
         return {"result": n}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.post("/matrix/product")
-def product(req: MatrixRequest):
+@router.post("/matrix/product", openapi_extra=MATRIX_BODY_DOC)
+async def product(request: Request, req: MatrixRequest = Depends(read_matrix_request)):
     try:
-        mat = np.array(req.matrix)
+        mat = load_matrix(req.matrix, req.sparse, keep_sparse=True)
         if req.vector is None:
             raise ValueError("Le vecteur n'est pas fourni.")
-        vec = np.array(req.vector)
-        prod = mat.dot(vec)
-        return {"result": prod.tolist()}
+        vec = np.asarray(req.vector)
+        prod = await compute_executor.run(compute_product, mat, vec)
+        return array_result(request, prod)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.post("/system/solve")
-def solve(req: MatrixRequest):
+def solve_system(method, mat, b, trace=None, tol=TOL, max_iter=MAX_ITER, omega=1.0, precheck=True):
+    if method == "gauss":
+        solution, steps = gaussian_elimination(mat, b)
+        return {"method": method, "steps": steps, "solution": solution}
+    elif method == "lu":
+        L, U, perm, steps, solution = lu_solve(mat, b, trace)
+        return {"method": method, "steps": steps, "L": L, "U": U, "perm": perm, "solution": solution}
+    else:
+        if precheck:
+            ensure_convergent(method, mat, omega)
+        solution, steps, convergence, status = iterative_solve(
+            method, mat, b, max_iter=max_iter, tol=tol, omega=omega
+        )
+        return {"method": method, "steps": steps, "solution": solution, "convergence": convergence, "status": status}
+
+@router.post("/system/solve", openapi_extra=MATRIX_BODY_DOC)
+async def solve(request: Request, trace: Optional[bool] = None, req: MatrixRequest = Depends(read_matrix_request)):
+    """
+    Solve Ax = b. With `Accept: application/x-npy` only the solution vector is
+    returned (as .npy); the step trace is JSON-only.
+    For LU, A[perm] = L @ U (partial pivoting) and the step trace is built for
+    small systems only unless `trace` is set.
+    """
     try:
-        mat = np.array(req.matrix)
-        b = np.array(req.vector) if req.vector is not None else None
         method = req.method
-        if method == "gauss":
-            if b is None:
-                raise HTTPException(status_code=400, detail="Le vecteur b est requis.")
-            solution, steps = gaussian_elimination(mat, b)
-            return {"method": method, "steps": steps, "solution": solution}
-        elif method == "lu":
-            if b is None:
-                raise HTTPException(status_code=400, detail="Le vecteur b est requis.")
-            L, U, steps, solution = lu_solve(mat, b)
-            return {"method": method, "steps": steps, "L": L, "U": U, "solution": solution}
-        elif method == "jacobi":
-            if b is None:
-                raise HTTPException(status_code=400, detail="Le vecteur b est requis.")
-            n = len(mat)
-            x = np.zeros(n)
-            steps = [f"Initial guess: {x.tolist()}"]
-            convergence = []
-            max_iter = 50
-            tol = 1e-8
-            for it in range(max_iter):
-                x_new = np.zeros(n)
-                for i in range(n):
-                    s = sum(mat[i][j] * x[j] for j in range(n) if j != i)
-                    x_new[i] = (b[i] - s) / mat[i][i]
-                err = np.linalg.norm(x_new - x, 2)
-                steps.append(f"Iter {it+1}: {x_new.tolist()} (err={err})")
-                convergence.append(float(err))
-                if err < tol:
-                    break
-                x = x_new
-            return {"method": method, "steps": steps, "solution": x.tolist(), "convergence": convergence}
-        elif method == "gauss-seidel":
-            if b is None:
-                raise HTTPException(status_code=400, detail="Le vecteur b est requis.")
-            n = len(mat)
-            x = np.zeros(n)
-            steps = [f"Initial guess: {x.tolist()}"]
-            convergence = []
-            max_iter = 50
-            tol = 1e-8
-            for it in range(max_iter):
-                x_new = x.copy()
-                for i in range(n):
-                    s1 = sum(mat[i][j] * x_new[j] for j in range(i))
-                    s2 = sum(mat[i][j] * x[j] for j in range(i+1, n))
-                    x_new[i] = (b[i] - s1 - s2) / mat[i][i]
-                err = np.linalg.norm(x_new - x, 2)
-                steps.append(f"Iter {it+1}: {x_new.tolist()} (err={err})")
-                convergence.append(float(err))
-                if err < tol:
-                    break
-                x = x_new
-            return {"method": method, "steps": steps, "solution": x.tolist(), "convergence": convergence}
-        else:
+        if method not in SOLVE_METHODS:
             raise HTTPException(status_code=400, detail="Méthode non supportée.")
+        if req.vector is None:
+            raise HTTPException(status_code=400, detail="Le vecteur b est requis.")
+        # Gauss et LU restent denses (traces pédagogiques), les méthodes itératives travaillent en CSR
+        mat = load_matrix(req.matrix, req.sparse, keep_sparse=method in ITERATIVE_METHODS)
+        b = np.asarray(req.vector)
+        params = {name: getattr(req, name) for name in ITERATIVE_PARAMS if name != "method"}
+        result = await result_cache.cached_async(
+            lambda: compute_executor.run(solve_system, method, mat, b, trace, **params),
+            "solve", mat, b, method=method, trace=trace, **params
+        )
+        if wants_npy(request.headers.get("accept")):
+            return array_result(request, result["solution"])
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# --- Itérations en flux (SSE / NDJSON) ---
+def finite_or_none(value):
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+def iteration_events(req, mat, b, x_points):
+    """
+    Yield one event per sweep (iteration number, error and optionally an
+    iterate subsampled to about `x_points` values), then a final "done" event.
+    Only the current iterate is kept in memory.
+    """
+    x = np.zeros(mat.shape[0])
+    step = max(1, math.ceil(len(x) / x_points)) if x_points > 0 else 0
+    status = None
+    it = 0
+    try:
+        for it, (x_new, err, status) in enumerate(
+            sweeps(req.method, mat, b, x, req.max_iter, req.tol, req.omega), start=1
+        ):
+            event = {"iter": it, "err": finite_or_none(err)}
+            if step:
+                event["x"] = [finite_or_none(v) for v in x_new[::step]]
+            yield "iteration", event
+            if status == "converged":
+                break
+            x = x_new
+    except Exception as e:
+        yield "error", {"detail": str(e)}
+        return
+    yield "done", {
+        "method": req.method,
+        "iterations": it,
+        "converged": status == "converged",
+        "status": status,
+        "solution": [finite_or_none(v) for v in x],
+    }
+
+def encode_events(events, sse):
+    for name, data in events:
+        if sse:
+            yield f"event: {name}\ndata: {json.dumps(data)}\n\n"
+        else:
+            yield json.dumps({"event": name, **data}) + "\n"
+
+@router.post("/system/solve/stream", openapi_extra=MATRIX_BODY_DOC)
+def solve_stream(request: Request, x_points: int = 0, req: MatrixRequest = Depends(read_matrix_request)):
+    """
+    Stream Jacobi / Gauss-Seidel / SOR / SSOR iterations while they run. Server-Sent Events
+    when the client accepts text/event-stream, NDJSON otherwise. Set `x_points`
+    to also receive a subsampled iterate with each event.
+    """
+    if req.method not in ITERATIVE_METHODS:
+        raise HTTPException(status_code=400, detail="Le flux n'est disponible que pour les méthodes itératives.")
+    if req.vector is None:
+        raise HTTPException(status_code=400, detail="Le vecteur b est requis.")
+    try:
+        mat = load_matrix(req.matrix, req.sparse, keep_sparse=True)
+        b = np.asarray(req.vector, dtype=float)
+        if req.precheck:
+            ensure_convergent(req.method, mat, req.omega)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    return StreamingResponse(
+        encode_events(iteration_events(req, mat, b, x_points), sse),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+# --- Opérations groupées ---
+MAX_BATCH_ITEMS = 1000
+
+class BatchItem(BaseModel):
+    op: Literal["determinant", "inverse", "transpose", "norm", "product", "solve"]
+    matrix: List[List[float]]
+    vector: Optional[List[float]] = None
+    norm_type: str = "fro"
+
+@router.post("/matrix/batch")
+async def batch(items: List[BatchItem]):
+    """
+    Run many small matrix operations in one request. Same-shaped items are
+    stacked and computed in a single vectorized call; per-item errors
+    (singular matrix, bad shape) are returned in place.
+    """
+    if len(items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Au plus {MAX_BATCH_ITEMS} éléments par lot.")
+    return {"results": await compute_executor.run(run_batch, items)}
+
+# --- Factorisation réutilisable : factoriser une fois, résoudre plusieurs seconds membres ---
+class FactorRequest(BaseModel):
+    matrix: Optional[List[List[float]]] = None
+    sparse: Optional[SparseMatrix] = None
+    kind: Literal["lu", "cholesky", "qr"] = "lu"
+    # Durée de vie (s) du handle, au plus FACTOR_CACHE_TTL
+    ttl: Optional[float] = Field(None, gt=0, le=factor_store.ttl)
+
+class FactorSolveRequest(BaseModel):
+    # Un vecteur b (n) ou une matrice B (n x k) de seconds membres en colonnes
+    b: Union[List[float], List[List[float]]]
+
+@router.post("/system/factor")
+def factor(req: FactorRequest):
+    try:
+        mat = load_matrix(req.matrix, req.sparse)
+        handle, entry = factor_store.put(req.kind, mat, req.ttl)
+        return {"handle": handle, "kind": entry["kind"], "n": entry["n"], "expires_at": entry["expires_at"]}
+    except MemoryError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/system/solve/{handle}")
+def solve_factored_system(handle: str, request: Request, req: FactorSolveRequest):
+    try:
+        X = factor_store.solve(handle, req.b)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Factorisation introuvable ou expirée.")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if wants_npy(request.headers.get("accept")):
+        return array_result(request, X)
+    return {"handle": handle, "solution": X.tolist()}
+
+@router.delete("/system/factor/{handle}")
+def delete_factor(handle: str):
+    try:
+        factor_store.delete(handle)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Factorisation introuvable ou expirée.")
+    return {"message": "Factorization deleted"}
+
+@router.get("/matrix/cache/stats")
+def cache_stats():
+    return result_cache.stats()
+
+@router.get("/compute/metrics")
+def compute_metrics():
+    """Compute pool counters, queue depth, queue wait and execution times (seconds)."""
+    return compute_executor.stats()
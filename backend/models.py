@@ -79,4 +79,11 @@ class CalendarEvent(BaseModel):
     title: str
     date: str # Using string to match frontend date input
     type: str # 'exam', 'assignment', 'reminder'
-    id_enseignant: int
\ No newline at end of file
+    id_enseignant: int
+
+class QuizProjection(BaseModel):
+    # Quiz restreint aux champs demandés par GET /quizzes?fields=...
+    id: Optional[int] = None
+    titre: Optional[str] = None
+    id_module: Optional[int] = None
+    questions: Optional[List[QuizQuestion]] = None
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Materialized per-student module progress: the module_progress table holds,
+per (student, module), the sums that GET /progress/module needs. It is
+updated incrementally by the progress writes and can be rebuilt from the
+raw tables:
+
+    python module_progress.py --check      # exit code 1 if it differs from the raw tables
+    python module_progress.py --rebuild
+"""
+
+import argparse
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+# Une vidéo est considérée comme vue à partir de ce pourcentage
+WATCHED_THRESHOLD = 90
+
+# Une recherche par clé primaire, plus les deux totaux du module (index)
+MODULE_PROGRESS_QUERY = """
+    SELECT
+        (SELECT COUNT(*) FROM lecon WHERE id_module = :module_id AND has_video = 1) AS total_videos,
+        (SELECT COUNT(*) FROM quiz WHERE id_module = :module_id) AS total_quizzes,
+        mp.video_progress_sum, mp.videos_watched, mp.quiz_score_sum, mp.quiz_count
+    FROM (SELECT 1)
+    LEFT JOIN module_progress mp ON mp.id_etudiant = :user_id AND mp.id_module = :module_id
+"""
+
+_RAW_PROGRESS_QUERY = """
+    SELECT id_etudiant, id_module,
+           SUM(video_progress) AS video_progress_sum, SUM(watched) AS videos_watched,
+           SUM(quiz_score) AS quiz_score_sum, SUM(quiz) AS quiz_count
+    FROM (
+        SELECT pe.id_etudiant, l.id_module, COALESCE(pe.score, 0) AS video_progress,
+               COALESCE(pe.score, 0) >= :threshold AS watched, 0 AS quiz_score, 0 AS quiz
+        FROM progression_etudiant pe
+        JOIN lecon l ON l.id_lecon = pe.id_lecon
+        WHERE l.has_video = 1 AND pe.id_etudiant IS NOT NULL {video_filter}
+        UNION ALL
+        SELECT sq.id_utilisateur, q.id_module, 0, 0, sq.score, 1
+        FROM score_quiz sq
+        JOIN quiz q ON q.id_quiz = sq.id_quiz
+        WHERE sq.score IS NOT NULL AND sq.id_utilisateur IS NOT NULL {quiz_filter}
+    )
+    WHERE id_module IS NOT NULL
+    GROUP BY id_etudiant, id_module
+"""
+
+# Progression enregistrée d'une liste de leçons vidéo du module (tampon de /progress/video)
+_STORED_VIDEO_PROGRESS_QUERY = """
+    SELECT l.id_lecon, pe.score
+    FROM lecon l
+    LEFT JOIN progression_etudiant pe ON pe.id_etudiant = ? AND pe.id_lecon = l.id_lecon
+    WHERE l.id_module = ? AND l.has_video = 1 AND l.id_lecon IN ({placeholders})
+"""
+
+_COLUMNS = ("video_progress_sum", "videos_watched", "quiz_score_sum", "quiz_count")
+
+_UPSERT = """
+    INSERT INTO module_progress (id_etudiant, id_module, video_progress_sum, videos_watched, quiz_score_sum, quiz_count)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (id_etudiant, id_module) DO UPDATE SET
+        video_progress_sum = video_progress_sum + excluded.video_progress_sum,
+        videos_watched = videos_watched + excluded.videos_watched,
+        quiz_score_sum = quiz_score_sum + excluded.quiz_score_sum,
+        quiz_count = quiz_count + excluded.quiz_count
+"""
+
+
+def apply_video_progress(connection, user_id, lesson_id, old_scores, new_score):
+    """
+    Add the change of a student's progress on a lesson (rows previously at
+    `old_scores`, None for a missing row, now all at `new_score`) to the
+    module totals. Lessons without a video block do not count.
+    """
+    row = connection.execute(
+        "SELECT id_module FROM lecon WHERE id_lecon = ? AND has_video = 1", (lesson_id,)
+    ).fetchone()
+    if row is None or row[0] is None:
+        return
+    new_score = new_score or 0
+    old_scores = [score or 0 for score in old_scores]
+    progress_delta = new_score * len(old_scores) - sum(old_scores)
+    watched_delta = (new_score >= WATCHED_THRESHOLD) * len(old_scores) - sum(s >= WATCHED_THRESHOLD for s in old_scores)
+    connection.execute(_UPSERT, (user_id, row[0], progress_delta, watched_delta, 0, 0))
+
+
+def apply_quiz_score(connection, user_id, quiz_id, score):
+    row = connection.execute("SELECT id_module FROM quiz WHERE id_quiz = ?", (quiz_id,)).fetchone()
+    if row is None or row[0] is None or score is None:
+        return
+    connection.execute(_UPSERT, (user_id, row[0], 0, 0, score, 1))
+
+
+def _raw_progress(connection, module_ids=None):
+    params = {"threshold": WATCHED_THRESHOLD}
+    video_filter = quiz_filter = ""
+    if module_ids is not None:
+        placeholders = ", ".join(f":m{i}" for i in range(len(module_ids)))
+        params.update({f"m{i}": module_id for i, module_id in enumerate(module_ids)})
+        video_filter = f"AND l.id_module IN ({placeholders})"
+        quiz_filter = f"AND q.id_module IN ({placeholders})"
+    query = _RAW_PROGRESS_QUERY.format(video_filter=video_filter, quiz_filter=quiz_filter)
+    return connection.execute(query, params).fetchall()
+
+
+def rebuild_module_progress(connection, module_ids=None):
+    """Recompute module_progress (all modules, or only `module_ids`) from the raw tables."""
+    if module_ids is not None:
+        module_ids = [module_id for module_id in set(module_ids) if module_id is not None]
+        if not module_ids:
+            return
+        placeholders = ", ".join("?" for _ in module_ids)
+        connection.execute(f"DELETE FROM module_progress WHERE id_module IN ({placeholders})", module_ids)
+    else:
+        connection.execute("DELETE FROM module_progress")
+    connection.executemany(
+        "INSERT INTO module_progress (id_etudiant, id_module, video_progress_sum, videos_watched, quiz_score_sum, quiz_count)"
+        " VALUES (?, ?, ?, ?, ?, ?)",
+        [tuple(row) for row in _raw_progress(connection, module_ids)],
+    )
+
+
+def check_module_progress(connection):
+    """(id_etudiant, id_module, stored, expected) for every row that differs from the raw tables."""
+    expected = {(row[0], row[1]): tuple(row[2:]) for row in _raw_progress(connection)}
+    stored = {
+        (row[0], row[1]): tuple(row[2:])
+        for row in connection.execute(f"SELECT id_etudiant, id_module, {', '.join(_COLUMNS)} FROM module_progress")
+    }
+    zero = (0,) * len(_COLUMNS)
+    differences = []
+    for key in sorted(set(expected) | set(stored)):
+        want, have = expected.get(key, zero), stored.get(key, zero)
+        if any(abs((a or 0) - (b or 0)) > 1e-9 for a, b in zip(want, have)):
+            differences.append((*key, have, want))
+    return differences
+
+
+def read_module_progress(connection, user_id, module_id, pending=None):
+    """
+    MODULE_PROGRESS_QUERY row of a student, plus the video progress still
+    buffered in memory (`pending`, {lesson_id: progress}). Run it in one read
+    snapshot: a buffered value already flushed then adds nothing.
+    """
+    row = dict(connection.execute(MODULE_PROGRESS_QUERY, {"user_id": user_id, "module_id": module_id}).fetchone())
+    if not pending:
+        return row
+    lesson_ids = list(pending)
+    placeholders = ", ".join("?" for _ in lesson_ids)
+    stored = connection.execute(
+        _STORED_VIDEO_PROGRESS_QUERY.format(placeholders=placeholders), (user_id, module_id, *lesson_ids)
+    ).fetchall()
+    for lesson_id, old_score in stored:
+        old_score, new_score = old_score or 0, pending[lesson_id] or 0
+        row['video_progress_sum'] = (row['video_progress_sum'] or 0) + new_score - old_score
+        row['videos_watched'] = (row['videos_watched'] or 0) \
+            + (new_score >= WATCHED_THRESHOLD) - (old_score >= WATCHED_THRESHOLD)
+    return row
+
+
+def summarize(row):
+    """GET /progress/module response from a MODULE_PROGRESS_QUERY row (70% videos, 30% quizzes)."""
+    total_videos = row['total_videos']
+    avg_video_progress = (row['video_progress_sum'] or 0) / total_videos if total_videos else 0
+    avg_quiz_score = (row['quiz_score_sum'] or 0) / row['quiz_count'] if row['quiz_count'] else 0
+    return {
+        "overall_progress": (avg_video_progress * 0.7) + (avg_quiz_score * 0.3),
+        "video_progress": avg_video_progress,
+        "quiz_score": avg_quiz_score,
+        "total_videos": total_videos,
+        "watched_videos": row['videos_watched'] or 0,
+        "total_quizzes": row['total_quizzes'],
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--rebuild", action="store_true", help="recompute the table from the raw tables")
+    action.add_argument("--check", action="store_true", help="compare the table with the raw tables")
+    args = parser.parse_args()
+
+    from database import db_manager
+    if args.rebuild:
+        db_manager.run_in_transaction(rebuild_module_progress)
+        logger.info("module_progress rebuilt")
+        differences = []
+    else:
+        with db_manager.lock:
+            differences = check_module_progress(db_manager.connection)
+        for user_id, module_id, stored, expected in differences:
+            logger.warning(f"student {user_id}, module {module_id}: stored {stored}, expected {expected}")
+        logger.info(f"module_progress check: {len(differences)} rows differ")
+    db_manager.close()
+    sys.exit(1 if differences else 0)
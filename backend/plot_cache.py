@@ -0,0 +1,223 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from importlib.metadata import PackageNotFoundError, version
+
+logger = logging.getLogger(__name__)
+
+# Cache adressé par contenu des images de /plot : clé = hash du code normalisé et des
+# options de rendu. Niveau mémoire LRU borné en octets, niveau disque dans backend/plot_cache,
+# hors des répertoires servis en statique (/media, /static) : les images ne sont
+# accessibles que par GET /plot/{clé}.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+try:
+    # Une autre version de matplotlib peut produire une image différente
+    RENDERER_VERSION = version("matplotlib")
+except PackageNotFoundError:
+    RENDERER_VERSION = "unknown"
+
+
+def normalize_code(code):
+    """Normalize line endings and trailing whitespace (indentation is kept)."""
+    lines = code.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+
+def plot_cache_key(code, **options):
+    h = hashlib.sha256()
+    h.update(RENDERER_VERSION.encode())
+    h.update(json.dumps(options, sort_keys=True).encode())
+    h.update(b"\0")
+    h.update(normalize_code(code).encode())
+    return h.hexdigest()
+
+
+class PlotCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024, disk_dir=None, max_disk_bytes=512 * 1024 * 1024,
+                 max_entry_bytes=1024 * 1024):
+        self.max_bytes = max_bytes
+        # Les images plus grandes restent sur disque et sont envoyées en flux
+        self.max_entry_bytes = max_entry_bytes
+        self.entries = OrderedDict()  # key -> (media_type, content)
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self.disk_bytes = sum(
+                e.stat().st_size for e in os.scandir(disk_dir) if e.is_file() and not e.name.endswith(".type")
+            )
+
+    def get(self, key):
+        """
+        (media_type, content, path) or None: content holds the bytes of small
+        images, path the cache file of large ones (to be streamed).
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], entry[1], None
+        entry = self._disk_get(key)
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            if entry[1] is not None:
+                self._store(key, (entry[0], entry[1]))
+        return entry
+
+    def put(self, key, media_type, content):
+        entry = (media_type, content)
+        with self.lock:
+            self._store(key, entry)
+        self._disk_put(key, entry)
+
+    def temp_path(self, key):
+        """Absolute path where a worker can render `key` before put_file(), or None without disk tier."""
+        if not self.disk_dir:
+            return None
+        return os.path.abspath(f"{self._disk_path(key)}.{uuid.uuid4().hex}.tmp")
+
+    def put_file(self, key, media_type, tmp_path):
+        """Move a rendered file into the cache; returns the same triple as get()."""
+        path = self._disk_path(key)
+        size = os.path.getsize(tmp_path)
+        with open(path + ".type", "w") as f:
+            f.write(media_type)
+        self._disk_replace(tmp_path, path, size)
+        if size > self.max_entry_bytes:
+            return media_type, None, path
+        with open(path, "rb") as f:
+            content = f.read()
+        with self.lock:
+            self._store(key, (media_type, content))
+        return media_type, content, None
+
+    def discard_temp(self, tmp_path):
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _store(self, key, entry):
+        if len(entry[1]) > min(self.max_bytes, self.max_entry_bytes):
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.total_bytes -= len(old[1])
+        self.entries[key] = entry
+        self.total_bytes += len(entry[1])
+        while self.total_bytes > self.max_bytes:
+            _, (_, content) = self.entries.popitem(last=False)
+            self.total_bytes -= len(content)
+
+    # Fichiers "<clé>" (contenu) et "<clé>.type" (type MIME)
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key)
+
+    def _disk_get(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path + ".type") as f:
+                media_type = f.read()
+            os.utime(path)  # ordre LRU de l'éviction disque
+            if os.path.getsize(path) > self.max_entry_bytes:
+                return media_type, None, path
+            with open(path, "rb") as f:
+                content = f.read()
+        except OSError:
+            return None
+        return media_type, content, None
+
+    def _disk_put(self, key, entry):
+        if not self.disk_dir:
+            return
+        media_type, content = entry
+        path = self._disk_path(key)
+        try:
+            if os.path.exists(path):
+                return
+            tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(content)
+            with open(path + ".type", "w") as f:
+                f.write(media_type)
+            self._disk_replace(tmp, path, len(content))
+        except OSError as e:
+            logger.warning(f"Plot cache write failed: {e}")
+
+    def _disk_replace(self, tmp_path, path, size):
+        """Move tmp_path onto path; a replaced file (concurrent render of the same key) is not counted twice."""
+        with self.lock:
+            try:
+                old_size = os.path.getsize(path)
+            except OSError:
+                old_size = 0
+            os.replace(tmp_path, path)
+        self._disk_added(size - old_size)
+
+    def _disk_added(self, size):
+        with self.lock:
+            self.disk_bytes += size
+            over_budget = self.disk_bytes > self.max_disk_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """Remove the least recently used files until the disk tier is back under 90% of its budget."""
+        files = [e for e in os.scandir(self.disk_dir) if e.is_file() and not e.name.endswith((".type", ".tmp"))]
+        files.sort(key=lambda e: e.stat().st_mtime)
+        total = sum(e.stat().st_size for e in files)
+        for entry in files:
+            if total <= self.max_disk_bytes * 0.9:
+                break
+            size = entry.stat().st_size
+            for path in (entry.path, entry.path + ".type"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+        with self.lock:
+            self.disk_bytes = total
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "disk_bytes": self.disk_bytes,
+                "max_disk_bytes": self.max_disk_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+
+# Instance globale configurée par variables d'environnement ; PLOT_CACHE_DIR relatif à
+# backend/ (indépendant du répertoire courant), vide = pas de niveau disque
+_disk_dir = os.getenv("PLOT_CACHE_DIR", "plot_cache")
+plot_cache = PlotCache(
+    max_bytes=int(os.getenv("PLOT_CACHE_MAX_MB", "64")) * 1024 * 1024,
+    disk_dir=os.path.join(BASE_DIR, _disk_dir) if _disk_dir else None,
+    max_disk_bytes=int(os.getenv("PLOT_CACHE_DISK_MB", "512")) * 1024 * 1024,
+    max_entry_bytes=int(os.getenv("PLOT_CACHE_ENTRY_KB", "1024")) * 1024,
+)
@@ -0,0 +1,430 @@
+import base64
+import contextlib
+import io
+import json
+import os
+
+import numpy as np
+
+from compute_pool import ComputeExecutor
+
+# Rendu de /plot dans un pool de processus dédié : chaque worker importe matplotlib
+# et initialise le canvas Agg une seule fois. Un worker n'exécute qu'un rendu à la fois :
+# le code utilise le vrai pyplot, dont l'état (figures, rcParams) est remis à zéro après
+# chaque requête.
+
+
+def warm_up_matplotlib():
+    import matplotlib
+    matplotlib.use("Agg")
+    import numpy  # noqa: F401
+    import matplotlib.pyplot as plt
+    # Premier rendu : charge les polices et le cache du backend
+    fig = plt.figure()
+    fig.add_subplot().plot([0, 1], [0, 1])
+    fig.savefig(io.BytesIO(), format="png")
+    plt.close("all")
+
+
+class SandboxPyplot:
+    """
+    `matplotlib.pyplot` as seen by the user code: every attribute is the real
+    one, except show/savefig/close, which are no-ops so that the current
+    figure is left for the server to render. This is not a file-write barrier:
+    Figure/Axes objects and numpy stay reachable from the code.
+    """
+
+    def __init__(self, pyplot):
+        self._pyplot = pyplot
+
+    def show(self, *args, **kwargs):
+        pass
+
+    def savefig(self, *args, **kwargs):
+        pass
+
+    def close(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._pyplot, name)
+
+
+PLOT_FORMATS = {"png": "image/png", "svg": "image/svg+xml", "webp": "image/webp"}
+# Au-delà de ce nombre de points, un tracé est rastérisé (SVG) ou le format "auto" choisit le PNG
+RASTERIZE_THRESHOLD = 5000
+
+
+def artist_points(artist):
+    if hasattr(artist, "get_xydata"):
+        return len(artist.get_xydata())
+    if hasattr(artist, "get_offsets"):
+        return len(artist.get_offsets())
+    return 0
+
+
+def resolve_format(fig, fmt, rasterize_threshold):
+    """
+    Pick the output format ("auto": SVG for light vector plots, PNG for
+    dense or image plots) and, for SVG, rasterize the artists that have more
+    than `rasterize_threshold` points.
+    """
+    artists = [artist for ax in fig.axes for artist in (*ax.lines, *ax.collections)]
+    points = [artist_points(artist) for artist in artists]
+    if fmt == "auto":
+        has_images = any(ax.images for ax in fig.axes)
+        fmt = "png" if has_images or sum(points) > rasterize_threshold else "svg"
+    if fmt == "svg":
+        for artist, n in zip(artists, points):
+            if n > rasterize_threshold:
+                artist.set_rasterized(True)
+    return fmt
+
+
+def render_plot(code, fmt="png", dpi=None, width=None, height=None,
+                rasterize_threshold=RASTERIZE_THRESHOLD, out_path=None):
+    """
+    Run `code` with pyplot and render its current figure. Returns
+    (media_type, content, None), with content None when the image was written
+    to `out_path`, or (None, None, error_output) when the code fails.
+    width/height are in pixels and override the figure size set by the code.
+    Runs inside a plot worker.
+    """
+    import matplotlib
+    import matplotlib.pyplot as plt
+
+    out = io.StringIO()
+    plt.close("all")
+    try:
+        # rc_context : rcParams / plt.style modifiés par le code restaurés après le rendu
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out), matplotlib.rc_context():
+            # Espace de noms restreint
+            exec(code, {"__builtins__": {}, "plt": SandboxPyplot(plt), "np": np})
+            fig = plt.gcf()
+            if dpi is not None:
+                fig.set_dpi(dpi)
+            if width is not None or height is not None:
+                # Une seule dimension fournie : proportions conservées
+                w, h = fig.get_size_inches() * fig.dpi
+                width = width or w * height / h
+                height = height or h * width / w
+                fig.set_size_inches(width / fig.dpi, height / fig.dpi)
+            fmt = resolve_format(fig, fmt, rasterize_threshold)
+            if out_path is not None:
+                # Écrit directement dans le cache disque, sans tampon mémoire
+                fig.savefig(out_path, format=fmt)
+                return PLOT_FORMATS[fmt], None, None
+            buf = io.BytesIO()
+            fig.savefig(buf, format=fmt)
+    except Exception as e:
+        if out_path is not None and os.path.exists(out_path):
+            os.remove(out_path)
+        return None, None, out.getvalue() + str(e)
+    finally:
+        plt.close("all")
+    return PLOT_FORMATS[fmt], buf.getvalue(), None
+
+
+# --- Mode data : le code est exécuté contre un plt qui enregistre les séries en JSON,
+# le rendu est fait par le frontend ---
+
+DATA_MAX_POINTS = 2000
+_FMT_COLORS = "bgrcmykw"
+_FMT_MARKERS = ".,ov^<>12348sp*hH+xXDd|_"
+_FMT_LINESTYLES = ("--", "-.", "-", ":")
+
+
+def parse_fmt(fmt):
+    """Split a matplotlib format string ("r--", "o", "C1:") into color, marker and linestyle."""
+    style = {}
+    i = 0
+    while i < len(fmt):
+        if fmt[i] == "C" and i + 1 < len(fmt) and fmt[i + 1].isdigit():
+            style["color"] = fmt[i:i + 2]
+            i += 2
+            continue
+        linestyle = next((ls for ls in _FMT_LINESTYLES if fmt.startswith(ls, i)), None)
+        if linestyle is not None:
+            style["linestyle"] = linestyle
+            i += len(linestyle)
+        elif fmt[i] in _FMT_COLORS:
+            style["color"] = fmt[i]
+            i += 1
+        elif fmt[i] in _FMT_MARKERS:
+            style["marker"] = fmt[i]
+            i += 1
+        else:
+            raise ValueError(f"Format de tracé invalide : '{fmt}'")
+    if "marker" in style and "linestyle" not in style:
+        style["linestyle"] = "None"
+    return style
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: indices of `n_out` points that keep the
+    visual shape of the curve (first and last points are always kept).
+    """
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    indices = np.empty(n_out, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Point moyen du seau suivant
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean() if next_end > end else x[-1]
+        avg_y = y[end:next_end].mean() if next_end > end else y[-1]
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.nanargmax(areas)) if np.isfinite(areas).any() else start
+        indices[i + 1] = a
+    return indices
+
+
+def downsample(x, y, max_points, ordered=True):
+    if len(x) <= max_points:
+        return x, y
+    if ordered:
+        keep = lttb(x, y, max_points)
+    else:
+        # Nuage de points : sous-échantillonnage régulier
+        keep = np.linspace(0, len(x) - 1, max_points).astype(int)
+    return x[keep], y[keep]
+
+
+def _as_values(values):
+    values = np.asarray(values, dtype=float)
+    if values.ndim > 2:
+        raise ValueError("Les données tracées doivent être de dimension 1 ou 2.")
+    return values
+
+
+def _style(kwargs, names):
+    style = {}
+    for name in names:
+        value = kwargs.get(name)
+        if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+            style[name] = value
+    return style
+
+
+class RecordingAxes:
+    """Axes stand-in that records series and labels instead of drawing."""
+
+    _LINE_STYLE = ("label", "color", "linestyle", "linewidth", "marker", "alpha")
+    _SCATTER_STYLE = ("label", "color", "marker", "s", "alpha")
+
+    def __init__(self, subplot=(1, 1, 1)):
+        self.subplot = subplot
+        self.series = []
+        self.props = {}
+
+    def plot(self, *args, **kwargs):
+        args = list(args)
+        while args:
+            # Groupes (x, y, fmt) successifs comme dans matplotlib
+            if len(args) == 1 or isinstance(args[1], str):
+                y = _as_values(args.pop(0))
+                x = np.arange(len(y), dtype=float)
+            else:
+                x, y = _as_values(args.pop(0)), _as_values(args.pop(0))
+            style = parse_fmt(args.pop(0)) if args and isinstance(args[0], str) else {}
+            style.update(_style({"color": kwargs.get("c"), **kwargs}, self._LINE_STYLE))
+            ys = y.T if y.ndim == 2 else [y]
+            for column in ys:
+                if len(x) != len(column):
+                    raise ValueError(f"x et y doivent avoir la même taille ({len(x)} et {len(column)}).")
+                self.series.append({"type": "line", **style, "x": x.ravel(), "y": column})
+
+    def scatter(self, x, y, s=None, c=None, marker=None, **kwargs):
+        x, y = _as_values(x).ravel(), _as_values(y).ravel()
+        if len(x) != len(y):
+            raise ValueError(f"x et y doivent avoir la même taille ({len(x)} et {len(y)}).")
+        style = _style({"s": s, "color": c, "marker": marker, **kwargs}, self._SCATTER_STYLE)
+        self.series.append({"type": "scatter", **style, "x": x, "y": y})
+
+    def _setter(name):
+        def setter(self, value, *args, **kwargs):
+            self.props[name] = value
+        return setter
+
+    set_title = _setter("title")
+    set_xlabel = _setter("xlabel")
+    set_ylabel = _setter("ylabel")
+    set_xscale = _setter("xscale")
+    set_yscale = _setter("yscale")
+    del _setter
+
+    def _limits(name):
+        def limits(self, left=None, right=None, **kwargs):
+            if isinstance(left, (tuple, list)):
+                left, right = left
+            current = self.props.get(name, [None, None])
+            self.props[name] = [
+                float(left) if left is not None else current[0],
+                float(right) if right is not None else current[1],
+            ]
+        return limits
+
+    set_xlim = _limits("xlim")
+    set_ylim = _limits("ylim")
+    del _limits
+
+    def get_xlim(self):
+        return tuple(self.props.get("xlim", (None, None)))
+
+    def get_ylim(self):
+        return tuple(self.props.get("ylim", (None, None)))
+
+    def legend(self, *args, **kwargs):
+        self.props["legend"] = True
+
+    def grid(self, visible=True, *args, **kwargs):
+        self.props["grid"] = bool(visible)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        raise AttributeError(f"{name} n'est pas disponible en mode data.")
+
+    def to_dict(self, max_points, encode):
+        series = []
+        for entry in self.series:
+            x, y = downsample(entry["x"], entry["y"], max_points, ordered=entry["type"] == "line")
+            series.append({**entry, "points": len(entry["x"]), "x": encode(x), "y": encode(y)})
+        return {"subplot": list(self.subplot), **self.props, "series": series}
+
+
+class RecordingPlt:
+    """
+    Stand-in for `matplotlib.pyplot` used by the data mode: it only records
+    what RecordingAxes supports and renders nothing.
+    """
+
+    _AXES_SETTERS = ("title", "xlabel", "ylabel", "xscale", "yscale")
+    _AXES_LIMITS = ("xlim", "ylim")
+
+    def __init__(self):
+        self._figure = self
+        self._axes = None
+        self.axes = []
+        self.props = {}
+
+    def gca(self):
+        if self._axes is None:
+            self._axes = self.axes[0] if self.axes else self.add_subplot()
+        return self._axes
+
+    def gcf(self):
+        return self
+
+    def sca(self, ax):
+        self._axes = ax
+
+    def show(self, *args, **kwargs):
+        pass
+
+    def savefig(self, *args, **kwargs):
+        pass
+
+    def close(self, *args, **kwargs):
+        pass
+
+    def add_subplot(self, nrows=1, ncols=1, index=1, **kwargs):
+        if isinstance(nrows, int) and nrows > 100:
+            nrows, ncols, index = (int(d) for d in str(nrows))
+        ax = RecordingAxes((nrows, ncols, index))
+        self.axes.append(ax)
+        return ax
+
+    def figure(self, *args, figsize=None, **kwargs):
+        if figsize is not None:
+            self.props["figsize"] = [float(v) for v in figsize]
+        return self
+
+    def subplot(self, *args, **kwargs):
+        self._axes = self.add_subplot(*args, **kwargs)
+        return self._axes
+
+    def subplots(self, nrows=1, ncols=1, figsize=None, squeeze=True, **kwargs):
+        self.figure(figsize=figsize)
+        axes = np.empty((nrows, ncols), dtype=object)
+        for i in range(nrows):
+            for j in range(ncols):
+                axes[i, j] = self.add_subplot(nrows, ncols, i * ncols + j + 1)
+        self._axes = axes[0, 0]
+        if squeeze:
+            axes = axes.item() if axes.size == 1 else axes.squeeze()
+        return self, axes
+
+    def suptitle(self, text, *args, **kwargs):
+        self.props["title"] = text
+
+    def tight_layout(self, *args, **kwargs):
+        pass
+
+    def colorbar(self, *args, **kwargs):
+        raise AttributeError("plt.colorbar n'est pas disponible en mode data.")
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in self._AXES_SETTERS:
+            return getattr(self.gca(), f"set_{name}")
+        if name in self._AXES_LIMITS:
+            ax = self.gca()
+
+            def limits(*args, **kwargs):
+                if args or kwargs:
+                    return getattr(ax, f"set_{name}")(*args, **kwargs)
+                return getattr(ax, f"get_{name}")()
+            return limits
+        if name in ("plot", "scatter", "legend", "grid"):
+            return getattr(self.gca(), name)
+        raise AttributeError(f"plt.{name} n'est pas disponible en mode data.")
+
+
+def _encode_json(values):
+    # Précision float32 (7 chiffres significatifs) ; NaN/inf -> null
+    return [float(f"{v:.7g}") if np.isfinite(v) else None for v in values.astype(np.float32).tolist()]
+
+
+def _encode_base64(values):
+    return base64.b64encode(np.ascontiguousarray(values, dtype="<f4").tobytes()).decode("ascii")
+
+
+def record_plot(code, max_points=DATA_MAX_POINTS, encoding="json"):
+    """
+    Run `code` against a RecordingPlt and return the recorded series as JSON
+    (same triple as render_plot). With encoding "base64", each x/y array is
+    little-endian float32 encoded in base64. Series longer than `max_points`
+    are downsampled (LTTB for lines). Runs inside a plot worker.
+    """
+    out = io.StringIO()
+    plt = RecordingPlt()
+    encode = _encode_base64 if encoding == "base64" else _encode_json
+    try:
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+            exec(code, {"__builtins__": {}, "plt": plt, "np": np})
+            data = {
+                "encoding": encoding,
+                "dtype": "float32",
+                **plt.props,
+                "axes": [ax.to_dict(max_points, encode) for ax in plt.axes],
+            }
+    except Exception as e:
+        return None, None, out.getvalue() + str(e)
+    return "application/json", json.dumps(data, separators=(",", ":")).encode(), None
+
+
+# Pool dédié au rendu des graphiques, séparé du pool de calcul numérique
+plot_executor = ComputeExecutor(
+    max_workers=int(os.getenv("PLOT_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    max_queue=int(os.getenv("PLOT_MAX_QUEUE", "32")),
+    cpu_timeout=float(os.getenv("PLOT_CPU_TIMEOUT", "10")),
+    memory_limit=int(os.getenv("PLOT_MEMORY_LIMIT_MB", "1024")) * 1024 * 1024,
+    warm_up=warm_up_matplotlib,
+)
@@ -0,0 +1,149 @@
+import asyncio
+import contextlib
+import logging
+import os
+import threading
+
+from database import async_db_manager
+from module_progress import apply_video_progress
+
+logger = logging.getLogger(__name__)
+
+# Tampon des écritures de POST /progress/video : le frontend envoie la progression en continu
+# pendant la lecture d'une vidéo ; seule la dernière valeur (et le maximum) par (étudiant, leçon)
+# est conservée et écrite périodiquement, en une transaction, par upsert.
+
+_UPSERT_PROGRESS = """
+    INSERT INTO progression_etudiant (id_etudiant, id_lecon, statut, score, score_max, temps_passe)
+    VALUES (?, ?, 'en_cours', ?, ?, 0)
+    ON CONFLICT (id_etudiant, id_lecon) DO UPDATE SET
+        score = excluded.score,
+        score_max = MAX(COALESCE(score_max, 0), excluded.score_max),
+        temps_passe = 0
+"""
+
+
+def write_progress_batch(connection, batch):
+    """Upsert {(user_id, lesson_id): (latest, max)} and update module_progress (caller's transaction)."""
+    for (user_id, lesson_id), (latest, best) in batch.items():
+        stored = connection.execute(
+            "SELECT score FROM progression_etudiant WHERE id_etudiant = ? AND id_lecon = ?", (user_id, lesson_id)
+        ).fetchone()
+        connection.execute(_UPSERT_PROGRESS, (user_id, lesson_id, latest, best))
+        apply_video_progress(connection, user_id, lesson_id, [stored[0] if stored else None], latest)
+
+
+class VideoProgressBuffer:
+    def __init__(self, db, flush_interval=0.5, max_entries=1000):
+        self.db = db
+        # 0 : écriture immédiate (pas de regroupement)
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self.entries = {}  # (user_id, lesson_id) -> [dernière valeur, maximum]
+        self.flushing = {}  # lot en cours d'écriture, encore visible par pending()
+        self.lock = threading.Lock()
+        self.flush_lock = asyncio.Lock()
+        self.task = None
+        self.recorded = 0
+        self.flushes = 0
+        self.flushed_entries = 0
+        self.errors = 0
+
+    def record(self, user_id, lesson_id, progress):
+        """Buffer a progress value; returns True when the buffer should be flushed now."""
+        with self.lock:
+            entry = self.entries.get((user_id, lesson_id))
+            if entry is None:
+                self.entries[(user_id, lesson_id)] = [progress, progress]
+            else:
+                entry[0] = progress
+                entry[1] = max(entry[1], progress)
+            self.recorded += 1
+            return self.flush_interval <= 0 or len(self.entries) >= self.max_entries
+
+    def pending(self, user_id):
+        """Latest unflushed progress of a student, {lesson_id: progress}."""
+        with self.lock:
+            return {
+                lesson_id: entry[0]
+                for source in (self.flushing, self.entries)
+                for (uid, lesson_id), entry in source.items()
+                if uid == user_id
+            }
+
+    def _take(self):
+        with self.lock:
+            batch, self.entries = self.entries, {}
+            self.flushing = batch
+            return {key: tuple(entry) for key, entry in batch.items()}
+
+    def _done(self, batch, error=None):
+        with self.lock:
+            self.flushing = {}
+            if error is None:
+                self.flushes += 1
+                self.flushed_entries += len(batch)
+                return
+            self.errors += 1
+            # Lot remis dans le tampon, sans écraser les valeurs reçues depuis
+            for key, (latest, best) in batch.items():
+                entry = self.entries.setdefault(key, [latest, best])
+                entry[1] = max(entry[1], best)
+        logger.error(f"Video progress flush failed ({len(batch)} entries kept for retry): {error}")
+
+    async def flush(self):
+        async with self.flush_lock:
+            batch = self._take()
+            if not batch:
+                with self.lock:
+                    self.flushing = {}
+                return
+            try:
+                await self.db.run_in_transaction(write_progress_batch, batch)
+            except Exception as e:
+                self._done(batch, e)
+                raise
+            self._done(batch)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                # shield : l'annulation (close) n'interrompt pas une écriture en cours, qui se
+                # termine (ou remet son lot dans le tampon) avant le dernier flush
+                await asyncio.shield(self.flush())
+            except Exception:
+                pass  # journalisé par _done, nouvel essai au prochain intervalle
+
+    def start(self):
+        if self.flush_interval > 0 and self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        """Stop the periodic flush, then write what is left (after any flush in progress)."""
+        if self.task is not None:
+            self.task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.task
+            self.task = None
+        await self.flush()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "pending": len(self.entries) + len(self.flushing),
+                "recorded": self.recorded,
+                "flushes": self.flushes,
+                "flushed_entries": self.flushed_entries,
+                "errors": self.errors,
+                "flush_interval": self.flush_interval,
+                "max_entries": self.max_entries,
+            }
+
+
+# Instance globale configurée par variables d'environnement
+progress_buffer = VideoProgressBuffer(
+    async_db_manager,
+    flush_interval=float(os.getenv("PROGRESS_FLUSH_MS", "500")) / 1000,
+    max_entries=int(os.getenv("PROGRESS_FLUSH_MAX", "1000")),
+)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Index advisor: runs EXPLAIN QUERY PLAN over every SQL string literal of the
+routers and reports the queries that still scan a whole table.
+
+Enabled at API startup with DB_EXPLAIN_QUERIES=1 (warnings in the logs), or
+run before a deploy:
+
+    python query_advisor.py    # exit code 1 if a lookup scans a table
+"""
+
+import ast
+import logging
+import os
+import re
+import sys
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROUTER_FILES = (
+    "main.py", "quiz_repository.py", "lesson_content.py", "module_progress.py", "progress_buffer.py",
+    "routes/calendar_routes.py", "routes/dashboard_routes.py",
+)
+
+_SQL = re.compile(r"^\s*(SELECT|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+_PAGINATION = re.compile(r"\b(LIMIT|OFFSET)\s+(\?|:\w+)", re.IGNORECASE)
+_NAMED = re.compile(r"(?<!:):(\w+)")
+
+
+def is_lookup(sql):
+    """
+    Queries filtered by a bound parameter must use an index; listings
+    (no parameter, e.g. "WHERE actif = 1") scan the table by design.
+    """
+    filters = _PAGINATION.sub("", sql)
+    return re.search(r"\bWHERE\b", sql, re.IGNORECASE) is not None and ("?" in filters or _NAMED.search(filters))
+
+
+def collect_queries(files=ROUTER_FILES):
+    """(location, sql) for every string literal of `files` that is an SQL statement."""
+    for name in files:
+        with open(os.path.join(BASE_DIR, name), encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=name)
+        for node in ast.walk(tree):
+            # Les gabarits complétés par str.format ("{filtre}") ne sont pas du SQL exécutable
+            if isinstance(node, ast.Constant) and isinstance(node.value, str) and _SQL.match(node.value) \
+                    and "{" not in node.value:
+                yield f"{name}:{node.lineno}", node.value
+
+
+def query_plan(connection, sql):
+    """Details of the EXPLAIN QUERY PLAN rows, placeholders bound to NULL."""
+    names = _NAMED.findall(sql)
+    params = {name: None for name in names} if names else (None,) * sql.count("?")
+    return [row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def full_scans(plan):
+    # "SCAN t USING COVERING INDEX ..." parcourt aussi tout l'index ; "SCAN CONSTANT ROW" et
+    # "SCAN (subquery-N)" ne lisent pas de table
+    return [
+        detail for detail in plan
+        if detail.startswith("SCAN ") and not detail.startswith(("SCAN CONSTANT ROW", "SCAN ("))
+    ]
+
+
+def check_queries(connection, files=ROUTER_FILES):
+    """Log and return (location, sql, scans) for the lookups whose plan scans a table."""
+    findings = []
+    for location, sql in collect_queries(files):
+        if not is_lookup(sql):
+            continue
+        try:
+            scans = full_scans(query_plan(connection, sql))
+        except Exception as e:
+            logger.warning(f"{location}: query cannot be explained: {e}")
+            continue
+        if scans:
+            statement = " ".join(sql.split())
+            logger.warning(f"{location}: {'; '.join(scans)} -- {statement}")
+            findings.append((location, sql, scans))
+    logger.info(f"Query plan check: {len(findings)} lookups scan a table")
+    return findings
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    from database import db_manager
+    with db_manager.lock:
+        findings = check_queries(db_manager.connection)
+    db_manager.close()
+    sys.exit(1 if findings else 0)
@@ -0,0 +1,87 @@
+import json
+
+from database import async_db_manager
+
+# Chargement des quiz avec leurs questions en deux requêtes ensemblistes (quiz de la page,
+# puis toutes leurs questions triées par quiz) au lieu d'une requête par quiz.
+
+QUIZ_FIELDS = ("id", "titre", "id_module", "questions")
+
+_PAGE_QUERY = "SELECT id_quiz, titre, id_module FROM quiz WHERE actif = 1 ORDER BY id_quiz LIMIT ? OFFSET ?"
+_PAGE_QUESTIONS_QUERY = """
+    SELECT id_question, id_quiz, enonce, choix, bonnes_reponses
+    FROM quiz_question
+    WHERE id_quiz IN (SELECT id_quiz FROM quiz WHERE actif = 1 ORDER BY id_quiz LIMIT ? OFFSET ?)
+    ORDER BY id_quiz, id_question
+"""
+
+
+def _read_page(connection, params, with_questions):
+    """Quiz rows of a page and, if asked, their questions; run in one read snapshot so that
+    the page subquery of the second query selects the same quizzes as the first."""
+    quiz_rows = [dict(row) for row in connection.execute(_PAGE_QUERY, params).fetchall()]
+    question_rows = []
+    if quiz_rows and with_questions:
+        question_rows = [dict(row) for row in connection.execute(_PAGE_QUESTIONS_QUERY, params).fetchall()]
+    return quiz_rows, question_rows
+
+
+def parse_fields(fields):
+    """Parse a `fields=` projection ("id,titre"); None or empty means every field."""
+    if not fields:
+        return None
+    selected = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(selected) - set(QUIZ_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown quiz fields: {', '.join(unknown)} (expected {', '.join(QUIZ_FIELDS)})")
+    return selected
+
+
+def assemble_quizzes(quiz_rows, question_rows, fields=None):
+    """Build quiz dicts in one pass over the quiz rows and the questions ordered by id_quiz."""
+    quizzes = {
+        row['id_quiz']: {"id": row['id_quiz'], "titre": row['titre'], "id_module": row['id_module'], "questions": []}
+        for row in quiz_rows
+    }
+    for q in question_rows:
+        quiz = quizzes.get(q['id_quiz'])
+        if quiz is not None:
+            quiz["questions"].append({
+                "id": q['id_question'],
+                "enonce": q['enonce'],
+                "choix": json.loads(q['choix']),
+                "bonnes_reponses": json.loads(q['bonnes_reponses']),
+            })
+    if fields is None:
+        return list(quizzes.values())
+    return [{name: quiz[name] for name in fields} for quiz in quizzes.values()]
+
+
+class QuizRepository:
+    def __init__(self, db):
+        self.db = db
+
+    async def list_active(self, limit=None, offset=0, fields=None):
+        """Active quizzes ordered by id; questions are only loaded when projected."""
+        params = (-1 if limit is None else limit, offset)
+        quiz_rows, question_rows = await self.db.read_snapshot(
+            _read_page, params, fields is None or "questions" in fields
+        )
+        return assemble_quizzes(quiz_rows, question_rows, fields)
+
+    async def get(self, quiz_id):
+        quiz_rows = await self.db.execute_query(
+            "SELECT id_quiz, titre, id_module FROM quiz WHERE id_quiz = ? AND actif = 1", (quiz_id,)
+        )
+        if not quiz_rows:
+            return None
+        question_rows = await self.db.execute_query(
+            "SELECT id_question, id_quiz, enonce, choix, bonnes_reponses FROM quiz_question"
+            " WHERE id_quiz = ? ORDER BY id_question",
+            (quiz_id,),
+        )
+        return assemble_quizzes(quiz_rows, question_rows)[0]
+
+
+# Instance globale
+quiz_repository = QuizRepository(async_db_manager)
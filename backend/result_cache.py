@@ -0,0 +1,198 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import scipy.sparse as sp
+
+logger = logging.getLogger(__name__)
+
+# Cache LRU (taille + TTL) des résultats d'opérations matricielles déterministes,
+# avec un niveau SQLite optionnel partagé entre workers et persistant aux redémarrages.
+# Les valeurs stockées doivent être sérialisables en JSON.
+
+
+def cache_key(op, *arrays, **params):
+    """Hash of the operation name, its parameters and the operand bytes."""
+    h = hashlib.sha256()
+    h.update(op.encode())
+    for name in sorted(params):
+        h.update(f"|{name}={params[name]}".encode())
+    for arr in arrays:
+        if arr is None:
+            h.update(b"|none")
+        elif sp.issparse(arr):
+            csr = sp.csr_matrix(arr)
+            csr.sum_duplicates()
+            h.update(f"|csr{csr.shape}".encode())
+            for part in (csr.indptr, csr.indices, csr.data):
+                h.update(np.ascontiguousarray(part).tobytes())
+        else:
+            # Réels normalisés en float64 (même clé pour [[1, 2]] et [[1.0, 2.0]]) ; un tableau
+            # complexe garde sa partie imaginaire
+            dtype = complex if np.iscomplexobj(arr) else float
+            a = np.ascontiguousarray(arr, dtype=dtype)
+            h.update(f"|{a.dtype.str}{a.shape}".encode())
+            h.update(a.tobytes())
+    return h.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, max_entries=256, ttl=3600.0, max_elements=250_000, db_path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # Les opérandes plus grands ne sont pas mis en cache (coût mémoire du résultat)
+        self.max_elements = max_elements
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.connection = None
+        if db_path:
+            self.connection = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+            self.db_lock = threading.Lock()
+            with self.db_lock:
+                self.connection.execute("PRAGMA journal_mode=WAL")
+                self.connection.execute("""
+                    CREATE TABLE IF NOT EXISTS result_cache (
+                        cache_key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                """)
+                self.connection.commit()
+
+    def cacheable(self, *arrays):
+        size = 0
+        for arr in arrays:
+            if arr is not None:
+                size += arr.nnz if sp.issparse(arr) else np.size(arr)
+        return size <= self.max_elements
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self.entries[key]
+                self.expirations += 1
+        found, value, expires_at = self._db_get(key, now)
+        with self.lock:
+            if found:
+                self.shared_hits += 1
+                self._store(key, value, expires_at)
+            else:
+                self.misses += 1
+        return found, value
+
+    def put(self, key, value):
+        expires_at = time.time() + self.ttl
+        with self.lock:
+            self._store(key, value, expires_at)
+        self._db_put(key, value, expires_at)
+
+    def get_or_compute(self, key, compute):
+        found, value = self.get(key)
+        if found:
+            return value
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def cached(self, compute, op, *arrays, **params):
+        """Cached compute() for `op` on `arrays`; oversized operands bypass the cache."""
+        if not self.cacheable(*arrays):
+            return compute()
+        return self.get_or_compute(cache_key(op, *arrays, **params), compute)
+
+    async def cached_async(self, compute, op, *arrays, **params):
+        """Same as cached() for a coroutine function (e.g. a job run in the compute pool)."""
+        if not self.cacheable(*arrays):
+            return await compute()
+        key = cache_key(op, *arrays, **params)
+        found, value = self.get(key)
+        if found:
+            return value
+        value = await compute()
+        self.put(key, value)
+        return value
+
+    def _store(self, key, value, expires_at):
+        self.entries[key] = (expires_at, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def _db_get(self, key, now):
+        if self.connection is None:
+            return False, None, None
+        try:
+            with self.db_lock:
+                row = self.connection.execute(
+                    "SELECT value, expires_at FROM result_cache WHERE cache_key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Result cache read failed: {e}")
+            return False, None, None
+        if row is None:
+            return False, None, None
+        return True, json.loads(row[0]), row[1]
+
+    def _db_put(self, key, value, expires_at):
+        if self.connection is None:
+            return
+        try:
+            with self.db_lock:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO result_cache (cache_key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at),
+                )
+                self.connection.execute("DELETE FROM result_cache WHERE expires_at <= ?", (time.time(),))
+                self.connection.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Result cache write failed: {e}")
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+        if self.connection is not None:
+            with self.db_lock:
+                self.connection.execute("DELETE FROM result_cache")
+                self.connection.commit()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "shared": self.connection is not None,
+            }
+
+
+# Instance globale configurée par variables d'environnement
+result_cache = ResultCache(
+    max_entries=int(os.getenv("MATRIX_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("MATRIX_CACHE_TTL", "3600")),
+    db_path=os.getenv("MATRIX_CACHE_DB") or None,
+)
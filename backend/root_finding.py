@@ -0,0 +1,376 @@
+from functools import cached_property
+
+import numpy as np
+
+from expressions import compile_derivative, compile_expression, evaluate, evaluate_many
+
+# Méthodes de résolution de f(x) = 0 partagées par les endpoints non linéaires.
+# Chaque méthode enregistre un constructeur de pas (comme STEPS dans iterative_solvers) ;
+# le moteur commun gère tolérance, nombre maximal d'itérations, divergence et trace d'erreurs.
+
+MAX_SAMPLES = 100_000
+MAX_ITER = 100
+TOL = 1e-10
+# |x| au-delà duquel une méthode ouverte (Newton, point fixe, ...) est déclarée divergente
+DIVERGENCE = 1e6
+# Pas des différences finies quand la dérivée symbolique n'est pas disponible
+FD_STEP = 1e-6
+FD2_STEP = 1e-4
+
+# name -> (constructeur de pas, méthode encadrante ?)
+ROOT_METHODS = {}
+LABELS = {
+    "dichotomie": "de dichotomie",
+    "newton": "de Newton",
+    "pointFixe": "du point fixe",
+    "secante": "de la sécante",
+    "regulaFalsi": "de la fausse position",
+    "brent": "de Brent",
+    "halley": "de Halley",
+    "newtonEncadre": "de Newton encadrée",
+}
+
+
+def root_method(name, bracketing=False):
+    """Register a step builder: builder(problem) -> step() -> (x, err, residual) or None."""
+    def register(builder):
+        ROOT_METHODS[name] = (builder, bracketing)
+        return builder
+    return register
+
+
+class RootProblem:
+    """f(x) = 0 with its start point x0 and/or bracket [a, b]; f', f'' and g are built on demand."""
+
+    def __init__(self, fx, x0=None, a=None, b=None, gx=None, interval=None):
+        self.text = fx.replace('^', '**').strip()
+        self.f = compile_expression(self.text)
+        self.x0, self.a, self.b = x0, a, b
+        self.gx = gx.strip() if gx else f"x - ({self.text})"
+        if interval is None and a is not None:
+            interval = f"[{a:g}, {b:g}]"
+        self.interval = interval
+
+    @cached_property
+    def df(self):
+        df = compile_derivative(self.text)
+        if df is not None:
+            return df
+        f = self.f
+        return lambda x: (f(x + FD_STEP) - f(x - FD_STEP)) / (2 * FD_STEP)
+
+    @cached_property
+    def d2f(self):
+        d2f = compile_derivative(self.text, 2)
+        if d2f is not None:
+            return d2f
+        f = self.f
+        return lambda x: (f(x + FD2_STEP) - 2 * f(x) + f(x - FD2_STEP)) / FD2_STEP ** 2
+
+    @cached_property
+    def g(self):
+        return compile_expression(self.gx)
+
+    def bracket(self, name):
+        """(a, fa, b, fb), checking that f changes sign on [a, b]."""
+        a, b = self.a, self.b
+        fa, fb = evaluate(self.f, a), evaluate(self.f, b)
+        if fa * fb > 0:
+            raise ValueError(
+                f"Pas de changement de signe trouvé pour la méthode {LABELS[name]} dans l'intervalle {self.interval}."
+            )
+        return a, fa, b, fb
+
+
+def run_method(name, problem, tol=TOL, max_iter=MAX_ITER):
+    """
+    Iterate method `name` on `problem`; returns (x, errors, status) with
+    status one of "converged", "diverged", "stalled" (zero derivative or
+    flat secant) or "max_iter".
+    """
+    builder, bracketing = ROOT_METHODS[name]
+    step = builder(problem)
+    x = problem.x0 if problem.x0 is not None else (problem.a + problem.b) / 2
+    errors = []
+    for _ in range(max_iter):
+        result = step()
+        if result is None:
+            return x, errors, "stalled"
+        x_new, err, residual = result
+        if not bracketing and (not np.isfinite(x_new) or abs(x_new) > DIVERGENCE):
+            return x, errors, "diverged"
+        errors.append(float(err))
+        x = x_new
+        if err < tol or (residual is not None and residual < tol):
+            return x, errors, "converged"
+    return x, errors, "max_iter"
+
+
+# --- Méthodes ouvertes (point de départ x0) ---
+@root_method("newton")
+def newton_step(prob):
+    x = prob.x0
+
+    def step():
+        nonlocal x
+        fx, dfx = evaluate(prob.f, x), evaluate(prob.df, x)
+        if abs(dfx) < 1e-12:
+            return None
+        x_next = x - fx / dfx
+        err = abs(x_next - x)
+        x = x_next
+        return x, err, None
+    return step
+
+
+@root_method("pointFixe")
+def fixed_point_step(prob):
+    x = prob.x0
+
+    def step():
+        nonlocal x
+        g = evaluate(prob.g, x)
+        err = abs(g - x)
+        x = g
+        return x, err, None
+    return step
+
+
+@root_method("secante")
+def secant_step(prob):
+    # Deux points de départ : x0 - 1 et x0
+    x_prev, x = prob.x0 - 1, prob.x0
+    f_prev, fx = evaluate(prob.f, x_prev), evaluate(prob.f, x)
+
+    def step():
+        nonlocal x_prev, x, f_prev, fx
+        if fx == f_prev:
+            return None
+        x_next = x - fx * (x - x_prev) / (fx - f_prev)
+        x_prev, f_prev = x, fx
+        x, fx = x_next, evaluate(prob.f, x_next)
+        return x, abs(x - x_prev), abs(fx)
+    return step
+
+
+@root_method("halley")
+def halley_step(prob):
+    x = prob.x0
+
+    def step():
+        nonlocal x
+        fx, dfx, d2fx = evaluate(prob.f, x), evaluate(prob.df, x), evaluate(prob.d2f, x)
+        denom = 2 * dfx ** 2 - fx * d2fx
+        if abs(denom) < 1e-24:
+            return None
+        x_next = x - 2 * fx * dfx / denom
+        err = abs(x_next - x)
+        x = x_next
+        return x, err, None
+    return step
+
+
+# --- Méthodes encadrantes (intervalle [a, b] avec changement de signe) ---
+@root_method("dichotomie", bracketing=True)
+def bisection_step(prob):
+    a, fa, b, _ = prob.bracket("dichotomie")
+
+    def step():
+        nonlocal a, fa, b
+        m = (a + b) / 2
+        fm = evaluate(prob.f, m)
+        err = abs(b - a)
+        if fa * fm < 0:
+            b = m
+        else:
+            a, fa = m, fm
+        return m, err, abs(fm)
+    return step
+
+
+@root_method("regulaFalsi", bracketing=True)
+def regula_falsi_step(prob):
+    """False position with the Illinois modification (no stuck endpoint)."""
+    a, fa, b, fb = prob.bracket("regulaFalsi")
+    c_prev = b
+    side = 0
+
+    def step():
+        nonlocal a, fa, b, fb, c_prev, side
+        if fa == fb:
+            return None
+        c = (a * fb - b * fa) / (fb - fa)
+        fc = evaluate(prob.f, c)
+        if fc * fb > 0:
+            b, fb = c, fc
+            if side == -1:
+                fa /= 2
+            side = -1
+        else:
+            a, fa = c, fc
+            if side == 1:
+                fb /= 2
+            side = 1
+        err = abs(c - c_prev)
+        c_prev = c
+        return c, err, abs(fc)
+    return step
+
+
+@root_method("brent", bracketing=True)
+def brent_step(prob):
+    """
+    Brent's method (zeroin): inverse quadratic interpolation or secant, with
+    a bisection step whenever interpolation does not shrink the bracket fast
+    enough. The error is the step size |b_k+1 - b_k|.
+    """
+    eps = np.finfo(float).eps
+    a, fa, b, fb = prob.bracket("brent")
+    c, fc = b, fb
+    d = e = b - a
+
+    def step():
+        nonlocal a, fa, b, fb, c, fc, d, e
+        if fb * fc > 0:
+            # c est l'autre extrémité de l'encadrement [b, c]
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+        if fb == 0:
+            return b, 0.0, 0.0
+        tol1 = 2 * eps * abs(b)
+        xm = (c - b) / 2
+        if abs(e) >= tol1 and abs(fa) > abs(fb):
+            s = fb / fa
+            if a == c:
+                # Sécante
+                p, q = 2 * xm * s, 1 - s
+            else:
+                # Interpolation quadratique inverse
+                q, r = fa / fc, fb / fc
+                p = s * (2 * xm * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2 * p < min(3 * xm * q - abs(tol1 * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = xm
+        else:
+            d = e = xm
+        a, fa = b, fb
+        b += d if abs(d) > tol1 else np.copysign(tol1, xm)
+        fb = evaluate(prob.f, b)
+        return b, abs(b - a), abs(fb)
+    return step
+
+
+@root_method("newtonEncadre", bracketing=True)
+def safe_newton_step(prob):
+    """
+    Newton from the bracket midpoint, with a bisection step whenever the
+    Newton step leaves the bracket (guaranteed convergence).
+    """
+    a, fa, b, _ = prob.bracket("newtonEncadre")
+    x = (a + b) / 2
+
+    def step():
+        nonlocal a, fa, b, x
+        fx = evaluate(prob.f, x)
+        if fx == 0:
+            return x, 0.0, 0.0
+        # Resserrer l'encadrement autour de la racine
+        if fa * fx < 0:
+            b = x
+        else:
+            a, fa = x, fx
+        dfx = evaluate(prob.df, x)
+        x_next = x - fx / dfx if dfx != 0 else None
+        if x_next is None or not np.isfinite(x_next) or not a < x_next < b:
+            x_next = (a + b) / 2
+        err = abs(x_next - x)
+        x = x_next
+        return x, err, None
+    return step
+
+
+# Méthodes proposées par /api/nonlinear_equation/convergence, dans l'ordre de calcul
+CONVERGENCE_METHODS = ("newton", "pointFixe", "dichotomie", "secante", "regulaFalsi", "brent", "halley")
+DEFAULT_METHODS = ("dichotomie", "newton", "pointFixe")
+# Méthodes proposées par /api/nonlinear_equation/roots -> méthode encadrante utilisée
+BRACKET_METHODS = {"brent": "brent", "dichotomie": "dichotomie", "regulaFalsi": "regulaFalsi", "newton": "newtonEncadre"}
+
+
+def convergence_traces(fx, x0, gx=None, methods=DEFAULT_METHODS, tol=TOL, max_iter=MAX_ITER):
+    """
+    Error trace of each requested method from x0, and the status of each
+    run under "status" ("converged", "diverged", "stalled" or "max_iter"):
+    a diverging method keeps its partial trace and does not fail the others.
+    Bracketing methods work on [x0-1, x0+1]; no sign change raises ValueError.
+    """
+    x0 = float(x0)
+    problem = RootProblem(fx, x0=x0, a=x0 - 1, b=x0 + 1, gx=gx, interval="[x0-1, x0+1]")
+    result = {}
+    statuses = {}
+    for name in CONVERGENCE_METHODS:
+        if name not in methods:
+            continue
+        _, errors, statuses[name] = run_method(name, problem, tol, max_iter)
+        result[name] = errors
+    result["status"] = statuses
+    return result
+
+
+def find_brackets(f, a, b, samples):
+    """
+    Sample f on `samples` points of [a, b] in one vectorized call and return
+    (brackets, exact_roots): the [x_k, x_k+1] with a sign change and the
+    sample points where f is exactly 0. Roots of even multiplicity (no sign
+    change, e.g. x**2) are not detected.
+    """
+    xs = np.linspace(a, b, samples)
+    ys = evaluate_many(f, xs)
+    finite = np.isfinite(ys)
+    exact = xs[finite & (ys == 0)]
+    s = np.sign(ys)
+    # Changement de signe strict entre deux échantillons finis (un pôle comme 1/x
+    # donne aussi un changement de signe : écarté après coup par |f(racine)|)
+    change = finite[:-1] & finite[1:] & (s[:-1] * s[1:] < 0)
+    idx = np.nonzero(change)[0]
+    return [(float(xs[i]), float(xs[i + 1])) for i in idx], [float(x) for x in exact]
+
+
+def find_roots(fx, a, b, samples=1000, method="brent", tol=TOL, max_iter=MAX_ITER):
+    """
+    Every root of fx on [a, b] with its convergence trace, one entry per
+    sign-change bracket (plus sample points where f is exactly zero).
+    """
+    if not a < b:
+        raise ValueError("L'intervalle doit vérifier a < b.")
+    f = compile_expression(fx.replace('^', '**').strip())
+    brackets, exact = find_brackets(f, a, b, samples)
+    roots = [
+        {"root": x, "bracket": [x, x], "f": 0.0, "iterations": 0, "converged": True, "status": "converged", "errors": []}
+        for x in exact
+    ]
+    for lo, hi in brackets:
+        problem = RootProblem(fx, a=lo, b=hi)
+        root, errors, status = run_method(BRACKET_METHODS[method], problem, tol, max_iter)
+        froot = float(evaluate(f, root))
+        # Un pôle (1/x, tan) change aussi de signe : |f| y explose au lieu de s'annuler
+        if not np.isfinite(froot) or abs(froot) > 1e-6 * max(1.0, abs(evaluate(f, lo)), abs(evaluate(f, hi))):
+            continue
+        roots.append({
+            "root": float(root),
+            "bracket": [lo, hi],
+            "f": froot,
+            "iterations": len(errors),
+            "converged": status == "converged",
+            "status": status,
+            "errors": errors,
+        })
+    roots.sort(key=lambda r: r["root"])
+    return {"method": method, "brackets": [list(br) for br in brackets], "roots": roots}
@@ -1,10 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends
-from database import db_manager
+from database import async_db_manager
 
 router = APIRouter()
 
 @router.get("/api/dashboard/stats/{enseignant_id}")
-def get_dashboard_stats(enseignant_id: int):
+async def get_dashboard_stats(enseignant_id: int):
     try:
         # --- Total Students ---
         # This query assumes a linking table between teachers, students, and modules.
@@ -16,12 +16,12 @@ def get_dashboard_stats(enseignant_id: int):
             JOIN groupe g ON ge.id_groupe = g.id_groupe
             WHERE g.id_enseignant = ? AND e.role = 'etudiant'
         """
-        total_students_result = db_manager.execute_query(students_query, (enseignant_id,))
+        total_students_result = await async_db_manager.execute_query(students_query, (enseignant_id,))
         total_students = total_students_result[0]['total_students'] if total_students_result else 0
 
         # --- Active Modules ---
         modules_query = "SELECT COUNT(id_module) as active_modules FROM module WHERE id_enseignant = ?"
-        active_modules_result = db_manager.execute_query(modules_query, (enseignant_id,))
+        active_modules_result = await async_db_manager.execute_query(modules_query, (enseignant_id,))
         active_modules = active_modules_result[0]['active_modules'] if active_modules_result else 0
 
         # --- Module Success Rate ---
@@ -34,7 +34,7 @@ def get_dashboard_stats(enseignant_id: int):
             WHERE m.id_enseignant = ?
             GROUP BY m.id_module, m.nom
         """
-        module_success_result = db_manager.execute_query(success_rate_query, (enseignant_id,))
+        module_success_result = await async_db_manager.execute_query(success_rate_query, (enseignant_id,))
         # Filter out modules with no success rate (None)
         module_success = [module for module in module_success_result if module['successRate'] is not None]
 
@@ -1,28 +1,42 @@
 import numpy as np
+from scipy.linalg import lu_factor, lu_solve as lapack_lu_solve, solve_triangular
 
-def lu_decomposition(A):
+# Au-delà de cette taille, la trace des étapes n'est construite que sur demande (trace=True)
+TRACE_MAX_N = 10
+
+def wants_trace(n, trace=None):
+    return n <= TRACE_MAX_N if trace is None else trace
+
+def lu_factorization(A):
+    """
+    LAPACK LU with partial pivoting (scipy.linalg.lu_factor).
+    Returns (L, U, perm, (lu, piv)) with A[perm] = L @ U.
+    """
+    A = np.asarray(A, dtype=float)
     n = len(A)
-    L = np.zeros((n, n))
-    U = np.zeros((n, n))
-    steps = []
+    lu, piv = lu_factor(A, check_finite=False)
+    if np.any(np.diag(lu) == 0):
+        raise ValueError("Matrix is singular.")
+    L = np.tril(lu, -1) + np.eye(n)
+    U = np.triu(lu)
+    perm = np.arange(n)
+    for i, p in enumerate(piv):
+        perm[i], perm[p] = perm[p], perm[i]
+    return L, U, perm, (lu, piv)
 
-    for i in range(n):
-        # Upper Triangular
-        for k in range(i, n):
-            sum_val = sum(L[i][j] * U[j][k] for j in range(i))
-            U[i][k] = A[i][k] - sum_val
+def lu_steps(piv):
+    steps = []
+    for i, p in enumerate(piv):
+        if p != i:
+            steps.append(f"Step {i+1}: Swapped rows {i+1} and {p+1} (partial pivoting).")
         steps.append(f"Step {i+1}: Calculated row {i+1} of U.")
-
-        # Lower Triangular
-        for k in range(i, n):
-            if i == k:
-                L[i][i] = 1
-            else:
-                sum_val = sum(L[k][j] * U[j][i] for j in range(i))
-                L[k][i] = (A[k][i] - sum_val) / U[i][i]
         steps.append(f"Step {i+1}: Calculated column {i+1} of L.")
+    return steps
 
-    return L.tolist(), U.tolist(), steps
+def lu_decomposition(A, trace=None):
+    L, U, perm, (_, piv) = lu_factorization(A)
+    steps = lu_steps(piv) if wants_trace(len(L), trace) else []
+    return L.tolist(), U.tolist(), perm.tolist(), steps
 
 def gaussian_elimination(A, b):
     n = len(A)
@@ -48,20 +62,17 @@ def gaussian_elimination(A, b):
 
     return x.tolist(), steps
 
-def lu_solve(A, b):
-    # Décomposition LU
-    L, U, steps = lu_decomposition(A)
-    n = len(A)
-    b = np.array(b)
-    # Résolution LY = b (descente)
-    Y = np.zeros(n)
-    steps_res = []
-    for i in range(n):
-        Y[i] = b[i] - np.dot(L[i, :i], Y[:i])
-        steps_res.append(f"Y[{i+1}] = {Y[i]}")
-    # Résolution UX = Y (remontée)
-    X = np.zeros(n)
-    for i in range(n-1, -1, -1):
-        X[i] = (Y[i] - np.dot(U[i, i+1:], X[i+1:])) / U[i, i]
-        steps_res.append(f"X[{i+1}] = {X[i]}")
-    return L.tolist(), U.tolist(), steps + steps_res, X.tolist()
\ No newline at end of file
+def lu_solve(A, b, trace=None):
+    # Décomposition LU (une seule factorisation, réutilisée pour la résolution)
+    L, U, perm, factors = lu_factorization(A)
+    n = len(L)
+    b = np.asarray(b, dtype=float)
+    X = lapack_lu_solve(factors, b, check_finite=False)
+    steps = []
+    if wants_trace(n, trace):
+        steps = lu_steps(factors[1])
+        # Résolution LY = Pb (descente) puis UX = Y (remontée)
+        Y = solve_triangular(L, b[perm], lower=True, unit_diagonal=True, check_finite=False)
+        steps += [f"Y[{i+1}] = {Y[i]}" for i in range(n)]
+        steps += [f"X[{i+1}] = {X[i]}" for i in range(n - 1, -1, -1)]
+    return L.tolist(), U.tolist(), perm.tolist(), steps, X.tolist()